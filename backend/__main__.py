@@ -3,6 +3,7 @@ from pathlib import Path
 from sys import path
 
 from uvicorn.server import Server
+from uvicorn.supervisors import ChangeReload, Multiprocess
 
 app_dir = Path(__file__).parent
 path.insert(0, app_dir.as_posix())
@@ -10,5 +11,13 @@ path.insert(0, app_dir.as_posix())
 from src.settings import ProjectSetting  # noqa: E402
 
 if __name__ == "__main__":
+    # Nothing but the uvicorn config is built here, workers are spawned and create their own app (and DB engines).
     uvicorn_config = ProjectSetting.from_dotenv(env_file=getenv("ENV_FILE", ".env")).to_uvicorn_config()
-    Server(config=uvicorn_config).run()
+    server = Server(config=uvicorn_config)
+
+    if uvicorn_config.should_reload:
+        ChangeReload(uvicorn_config, target=server.run, sockets=[uvicorn_config.bind_socket()]).run()
+    elif uvicorn_config.workers > 1:
+        Multiprocess(uvicorn_config, target=server.run, sockets=[uvicorn_config.bind_socket()]).run()
+    else:
+        server.run()
@@ -0,0 +1,33 @@
+from collections.abc import Callable
+from functools import partial
+from os import getenv
+from pathlib import Path
+from sys import stdout
+
+from anyio import open_file, wrap_file
+from asyncer import syncify
+from src.repositories.device import DeviceRepository
+from src.services.device import DeviceService
+from src.settings import ProjectSetting
+
+
+@partial(syncify, raise_sync_error=False)
+async def export_devices(output: Path | None = None) -> None:  # type: ignore[misc]
+    """Export every device with its effective autoinstall config as NDJSON, to stdout or the given file."""
+    config = ProjectSetting.from_dotenv(env_file=getenv("ENV_FILE", ".env"))
+
+    async with config.sqlalchemy.async_read_only_session_maker() as session:
+        try:
+            device_svc = DeviceService(repository=DeviceRepository(session=session))
+            f = await open_file(output, "wb") if output else wrap_file(stdout.buffer)
+            try:
+                async for line in device_svc.export_ndjson():
+                    await f.write(line)
+            finally:
+                await (f.aclose() if output else f.flush())
+        finally:
+            await session.aclose()
+            await config.sqlalchemy.async_cleanup()
+
+
+cli_patterns: list[Callable] = [export_devices]
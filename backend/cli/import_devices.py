@@ -0,0 +1,37 @@
+from collections.abc import Callable
+from functools import partial
+from os import getenv
+from pathlib import Path
+
+from anyio import Path as AsyncPath
+from asyncer import syncify
+from src.repositories.device import DeviceRepository
+from src.schemas.device_import import DeviceImportFormat
+from src.services.device import DeviceService
+from src.settings import ProjectSetting
+
+
+@partial(syncify, raise_sync_error=False)
+async def import_devices(source: Path, format: str | None = None) -> None:  # type: ignore[misc]
+    """Create or update devices from a CSV (name,serial,config_node_path) or NDJSON file, format defaults to the file suffix."""
+    config = ProjectSetting.from_dotenv(env_file=getenv("ENV_FILE", ".env"))
+    import_format: DeviceImportFormat = "ndjson" if (format or source.suffix.lstrip(".")) in ("ndjson", "jsonl") else "csv"
+
+    async with config.sqlalchemy.async_session_maker() as session:
+        try:
+            device_svc = DeviceService(repository=DeviceRepository(session=session))
+            result = await device_svc.bulk_import(content=await AsyncPath(source).read_bytes(), format=import_format)
+            await session.commit()
+
+            print(f"Created {result.created}, updated {result.updated}, unchanged {result.unchanged} device(s).")
+            for error in result.errors:
+                print(f"line {error.line}: {error.msg}")
+        except Exception:
+            await session.rollback()
+            raise
+        finally:
+            await session.aclose()
+            await config.sqlalchemy.async_cleanup()
+
+
+cli_patterns: list[Callable] = [import_devices]
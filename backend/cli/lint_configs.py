@@ -0,0 +1,40 @@
+from collections.abc import Callable
+from functools import partial
+from os import cpu_count, getenv
+from sys import stderr, stdout
+
+from asyncer import syncify
+from src.executors.process_pool import ProcessPoolJobExecutor
+from src.repositories.config_node import ConfigNodeRepository
+from src.services.config_node import ConfigNodeService
+from src.settings import ProjectSetting
+from typer import Exit
+
+
+@partial(syncify, raise_sync_error=False)
+async def lint_configs() -> None:  # type: ignore[misc]
+    """Revalidate the effective config of every ConfigNode used by a device on all cores, printing each failure as an NDJSON line."""
+    config = ProjectSetting.from_dotenv(env_file=getenv("ENV_FILE", ".env"))
+    executor = ProcessPoolJobExecutor(config.executor.workers or cpu_count() or 1, config.executor.max_pending, config.executor.job_timeout)
+
+    failures = devices = 0
+    async with config.sqlalchemy.async_read_only_session_maker() as session:
+        try:
+            await executor.start()
+            config_node_svc = ConfigNodeService(repository=ConfigNodeRepository(session=session, executor=executor))
+            async for result in config_node_svc.lint():
+                failures += 1
+                devices += len(result.device_ids)
+                stdout.buffer.write(result.to_ndjson())
+                stdout.flush()
+        finally:
+            executor.shutdown()
+            await session.aclose()
+            await config.sqlalchemy.async_cleanup()
+
+    print(f"{failures} invalid config node(s), used by {devices} device(s).", file=stderr)
+    if failures:
+        raise Exit(code=1)
+
+
+cli_patterns: list[Callable] = [lint_configs]
@@ -0,0 +1,62 @@
+from asyncio import to_thread
+from collections.abc import Callable
+from functools import partial
+from os import getenv
+from pathlib import Path
+from sys import stderr
+
+from asyncer import syncify
+from src.builders.iso import IsoBuilder
+from src.settings import ProjectSetting
+from src.stores.chunk import ChunkStore
+from src.tasks.download_ubuntu_iso import download_latest_ubuntu_iso
+from typer import Exit
+
+
+def print_usage(store: ChunkStore) -> None:
+    usage = store.usage()
+    print(
+        f"{usage.artifacts} ISOs, {usage.logical_size / 2**30:.2f} GiB stored as {usage.chunks} chunks,"
+        f" {usage.physical_size / 2**30:.2f} GiB on disk."
+    )
+
+
+@partial(syncify, raise_sync_error=False)
+async def mirror_iso(source: Path | None = None, lts: bool = True) -> None:  # type: ignore[misc]
+    """Add an ISO to the local mirror, downloading the latest Ubuntu release into the input directory when no source is given."""
+    config = ProjectSetting.from_dotenv(env_file=getenv("ENV_FILE", ".env"))
+    store = ChunkStore(config.iso.mirror_dir)
+
+    if source is None:
+        source = await download_latest_ubuntu_iso(config.iso.input_dir, lts=lts, print_progress=True)
+    manifest = await to_thread(store.ingest_file, source.name, source)
+    print(f"Mirrored {manifest.name} ({manifest.sha256}).")
+    await to_thread(print_usage, store)
+
+
+@partial(syncify, raise_sync_error=False)
+async def mirror_build(key: str) -> None:  # type: ignore[misc]
+    """Add a built ISO to the local mirror, where it only adds the chunks around its patches to the ones of its base ISO."""
+    config = ProjectSetting.from_dotenv(env_file=getenv("ENV_FILE", ".env"))
+    store, iso_builder = ChunkStore(config.iso.mirror_dir), IsoBuilder(config.iso)
+
+    if not (manifest := await iso_builder.get_artifact(key)):
+        print(f"No build found for {key}.", file=stderr)
+        raise Exit(1)
+    mirrored = await to_thread(store.ingest, f"{key}.iso", iso_builder.iter_artifact(manifest))
+    print(f"Mirrored {mirrored.name} ({mirrored.sha256}).")
+    await to_thread(print_usage, store)
+
+
+@partial(syncify, raise_sync_error=False)
+async def prune_mirror(name: str | None = None) -> None:  # type: ignore[misc]
+    """Remove the named ISO from the mirror if given, then delete the chunks no mirrored ISO refers to anymore."""
+    config = ProjectSetting.from_dotenv(env_file=getenv("ENV_FILE", ".env"))
+    store = ChunkStore(config.iso.mirror_dir)
+    if name:
+        store.remove(name)
+    print(f"Removed {await to_thread(store.prune)} chunks.")
+    await to_thread(print_usage, store)
+
+
+cli_patterns: list[Callable] = [mirror_iso, mirror_build, prune_mirror]
@@ -0,0 +1,27 @@
+from collections.abc import Callable
+from functools import partial
+from os import getenv
+
+from asyncer import syncify
+from src.repositories.rendered_config import RenderedConfigRepository
+from src.settings import ProjectSetting
+
+
+@partial(syncify, raise_sync_error=False)
+async def render_configs() -> None:  # type: ignore[misc]
+    config = ProjectSetting.from_dotenv(env_file=getenv("ENV_FILE", ".env"))
+
+    async with config.sqlalchemy.async_session_maker() as session:
+        try:
+            count = await RenderedConfigRepository(session=session).refresh_all()
+            await session.commit()
+            print(f"Rendered {count} device configs.")
+        except Exception:
+            await session.rollback()
+            raise
+        finally:
+            await session.aclose()
+            await config.sqlalchemy.async_cleanup()
+
+
+cli_patterns: list[Callable] = [render_configs]
@@ -0,0 +1,34 @@
+from asyncio import Event
+from collections.abc import Callable
+from functools import partial
+from os import getenv
+
+from asyncer import syncify
+from src.executors.background import BackgroundJobRunner
+from src.executors.process_pool import ProcessPoolJobExecutor
+from src.settings import ProjectSetting
+from src.tasks.jobs import JOB_HANDLERS
+
+
+@partial(syncify, raise_sync_error=False)
+async def run_jobs() -> None:  # type: ignore[misc]
+    """Run the queued background jobs until interrupted, e.g. on a dedicated host with JOB__ENABLED=false on the API servers."""
+    config = ProjectSetting.from_dotenv(env_file=getenv("ENV_FILE", ".env"))
+    executor = None
+    if config.executor.enabled:
+        executor = ProcessPoolJobExecutor(config.executor_workers, config.executor.max_pending, config.executor.job_timeout)
+        await executor.start()
+    runner = BackgroundJobRunner(config, JOB_HANDLERS, executor=executor)
+
+    try:
+        await runner.start()
+        print(f"Running jobs as {runner.worker_id}, press Ctrl+C to stop.")
+        await Event().wait()
+    finally:
+        await runner.shutdown()
+        if executor:
+            executor.shutdown()
+        await config.sqlalchemy.async_cleanup()
+
+
+cli_patterns: list[Callable] = [run_jobs]
@@ -1,14 +1,24 @@
+from asyncio import CancelledError, create_task, gather
 from collections.abc import AsyncGenerator
-from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager, suppress
 from os import getenv
 
 from fastapi import FastAPI
 from fastapi.middleware import Middleware
 from fastapi.middleware.cors import CORSMiddleware
 
+from .builders.iso import IsoBuilder
+from .caches.config_node_tree import ConfigNodeTreeCache
+from .caches.json_schema import JSONSchemaCache
 from .error_handlers import get_error_handlers
+from .executors.background import BackgroundJobRunner
+from .executors.process_pool import ProcessPoolJobExecutor
+from .models import MODELS
 from .routes import router
+from .schemas.page import NEXT_CURSOR_HEADER
 from .settings import ProjectSetting
+from .tasks.jobs import JOB_HANDLERS
+from .utils.third_parties.sqlalchemylib import prewarm_pool, watch_pool_liveness
 
 
 def create_app() -> FastAPI:
@@ -17,7 +27,42 @@ def create_app() -> FastAPI:
     @asynccontextmanager
     async def app_lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
         app.state.config = config
+        app.state.json_schema_cache = JSONSchemaCache.from_models(MODELS)
+        app.state.job_executor = None
+        if config.executor.enabled:
+            job_executor = ProcessPoolJobExecutor(config.executor_workers, config.executor.max_pending, config.executor.job_timeout)
+            await job_executor.start()
+            app.state.job_executor = job_executor
+        app.state.iso_builder = IsoBuilder(config.iso)
+        app.state.config_node_tree_cache = ConfigNodeTreeCache()
+        background_tasks = [create_task(app.state.config_node_tree_cache.listen(config.sqlalchemy.dsn))]
+        job_runner = None
+        if config.job.enabled:
+            job_runner = BackgroundJobRunner(
+                config,
+                JOB_HANDLERS,
+                executor=app.state.job_executor,
+                tree_cache=app.state.config_node_tree_cache,
+                iso_builder=app.state.iso_builder,
+            )
+            await job_runner.start()
+
+        engines = [engine for engine in (config.sqlalchemy.async_engine, config.sqlalchemy.async_replica_engine) if engine]
+        if prewarm := min(config.sqlalchemy.pool_prewarm, config.sqlalchemy.pool_size):
+            await gather(*(prewarm_pool(engine, prewarm) for engine in engines))
+        if config.sqlalchemy.pool_liveness_interval > 0:
+            background_tasks += [create_task(watch_pool_liveness(engine, config.sqlalchemy.pool_liveness_interval)) for engine in engines]
+
         yield
+
+        for task in background_tasks:
+            task.cancel()
+            with suppress(CancelledError):
+                await task
+        if job_runner:
+            await job_runner.shutdown()
+        if app.state.job_executor:
+            app.state.job_executor.shutdown()
         await config.sqlalchemy.async_cleanup()
 
     app = FastAPI(
@@ -31,6 +76,7 @@ def create_app() -> FastAPI:
                 allow_credentials=True,
                 allow_methods=["*"],
                 allow_headers=["*"],
+                expose_headers=[NEXT_CURSOR_HEADER],
             ),
         ],
     )
@@ -0,0 +1,32 @@
+"""
+20261017_143000
+
+Revision ID: 2cff0265b988
+Revises: f02a65a64617
+Create Date: 2026-10-17 14:30:00.000000+09:00
+"""
+
+from collections.abc import Sequence
+
+from alembic.op import create_index, drop_index, f
+
+revision: str = "2cff0265b988"
+down_revision: str | Sequence[str] | None = "f02a65a64617"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    create_index(f("ix_confignode_updated_at_id"), "confignode", ["updated_at", "id"], unique=False)
+    create_index(f("ix_confignode_name_pattern"), "confignode", ["name"], unique=False, postgresql_ops={"name": "text_pattern_ops"})
+    create_index(f("ix_device_updated_at_id"), "device", ["updated_at", "id"], unique=False)
+    create_index(f("ix_device_name_pattern"), "device", ["name"], unique=False, postgresql_ops={"name": "text_pattern_ops"})
+    create_index(f("ix_device_config_node_id"), "device", ["config_node_id"], unique=False)
+
+
+def downgrade() -> None:
+    drop_index(f("ix_device_config_node_id"), table_name="device")
+    drop_index(f("ix_device_name_pattern"), table_name="device")
+    drop_index(f("ix_device_updated_at_id"), table_name="device")
+    drop_index(f("ix_confignode_name_pattern"), table_name="confignode")
+    drop_index(f("ix_confignode_updated_at_id"), table_name="confignode")
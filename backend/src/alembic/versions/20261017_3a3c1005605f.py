@@ -0,0 +1,57 @@
+"""
+20261017_101500
+
+Revision ID: 3a3c1005605f
+Revises: 0dabaf2f5d15
+Create Date: 2026-10-17 10:15:00.000000+09:00
+"""
+
+from collections.abc import Sequence
+
+from alembic.op import create_index, create_table, drop_index, drop_table, execute, f
+from sqlalchemy.sql.elements import TextClause
+from sqlalchemy.sql.schema import Column, ForeignKeyConstraint, PrimaryKeyConstraint
+from sqlalchemy.sql.sqltypes import DateTime, LargeBinary, Uuid
+from sqlmodel.sql.sqltypes import AutoString
+
+revision: str = "3a3c1005605f"
+down_revision: str | Sequence[str] | None = "0dabaf2f5d15"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    create_table(
+        "renderedconfig",
+        Column("id", Uuid(), nullable=False),
+        Column("created_at", DateTime(), server_default=TextClause("now()"), nullable=False),
+        Column("updated_at", DateTime(), server_default=TextClause("now()"), nullable=False),
+        Column("device_id", Uuid(), nullable=False),
+        Column("identifier", AutoString(), nullable=False),
+        Column("user_data", LargeBinary(), nullable=False),
+        Column("meta_data", LargeBinary(), nullable=False),
+        Column("content_hash", AutoString(), nullable=False),
+        ForeignKeyConstraint(["device_id"], ["device.id"], name=f("fk_renderedconfig_device_id_device"), ondelete="CASCADE"),
+        PrimaryKeyConstraint("id", name=f("pk_renderedconfig")),
+    )
+    create_index(f("ix_renderedconfig_id"), "renderedconfig", ["id"], unique=False)
+    create_index(f("ix_renderedconfig_device_id"), "renderedconfig", ["device_id"], unique=True)
+    create_index(f("ix_renderedconfig_identifier"), "renderedconfig", ["identifier"], unique=True)
+    execute(
+        """
+            CREATE TRIGGER trg_set_updated_at
+            BEFORE UPDATE ON renderedconfig
+            FOR EACH ROW
+            WHEN (OLD IS DISTINCT FROM NEW)
+            EXECUTE FUNCTION set_updated_at_now();
+        """
+    )
+    # Existing devices are rendered by `python -m backend.cli render-configs`.
+
+
+def downgrade() -> None:
+    drop_index(f("ix_renderedconfig_identifier"), table_name="renderedconfig")
+    drop_index(f("ix_renderedconfig_device_id"), table_name="renderedconfig")
+    drop_index(f("ix_renderedconfig_id"), table_name="renderedconfig")
+    execute("DROP TRIGGER IF EXISTS trg_set_updated_at ON renderedconfig;")
+    drop_table("renderedconfig")
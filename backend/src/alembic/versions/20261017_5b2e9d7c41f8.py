@@ -0,0 +1,73 @@
+"""
+20261017_160000
+
+Revision ID: 5b2e9d7c41f8
+Revises: a8171ec19bc3
+Create Date: 2026-10-17 16:00:00.000000+09:00
+"""
+
+from collections.abc import Sequence
+
+from alembic.op import create_index, create_table, drop_index, drop_table, execute, f
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.sql.elements import TextClause
+from sqlalchemy.sql.schema import Column, PrimaryKeyConstraint
+from sqlalchemy.sql.sqltypes import DateTime, Float, Integer, Uuid
+from sqlmodel.sql.sqltypes import AutoString
+
+revision: str = "5b2e9d7c41f8"
+down_revision: str | Sequence[str] | None = "a8171ec19bc3"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    create_table(
+        "job",
+        Column("id", Uuid(), nullable=False),
+        Column("created_at", DateTime(), server_default=TextClause("now()"), nullable=False),
+        Column("updated_at", DateTime(), server_default=TextClause("now()"), nullable=False),
+        Column("type", AutoString(), nullable=False),
+        Column("status", AutoString(), nullable=False),
+        Column("dedupe_key", AutoString(), nullable=True),
+        Column("payload", JSONB(), nullable=False),
+        Column("result", JSONB(), nullable=True),
+        Column("error", AutoString(), nullable=True),
+        Column("progress", Float(), nullable=False),
+        Column("attempts", Integer(), nullable=False),
+        Column("worker_id", AutoString(), nullable=True),
+        Column("lease_expires_at", DateTime(), nullable=True),
+        Column("started_at", DateTime(), nullable=True),
+        Column("finished_at", DateTime(), nullable=True),
+        PrimaryKeyConstraint("id", name=f("pk_job")),
+    )
+    create_index(f("ix_job_id"), "job", ["id"], unique=False)
+    create_index(f("ix_job_updated_at_id"), "job", ["updated_at", "id"], unique=False)
+    create_index(f("ix_job_type_status_created_at"), "job", ["type", "status", "created_at"], unique=False)
+    create_index(
+        f("uq_job_type_dedupe_key"),
+        "job",
+        ["type", "dedupe_key"],
+        unique=True,
+        postgresql_where=TextClause("status IN ('pending', 'running') AND dedupe_key IS NOT NULL"),
+    )
+    execute(
+        """
+            CREATE TRIGGER trg_set_updated_at
+            BEFORE UPDATE ON job
+            FOR EACH ROW
+            WHEN (OLD IS DISTINCT FROM NEW)
+            EXECUTE FUNCTION set_updated_at_now();
+        """
+    )
+
+
+def downgrade() -> None:
+    execute("DROP TRIGGER IF EXISTS trg_set_updated_at ON job;")
+    drop_index(
+        f("uq_job_type_dedupe_key"), table_name="job", postgresql_where=TextClause("status IN ('pending', 'running') AND dedupe_key IS NOT NULL")
+    )
+    drop_index(f("ix_job_type_status_created_at"), table_name="job")
+    drop_index(f("ix_job_updated_at_id"), table_name="job")
+    drop_index(f("ix_job_id"), table_name="job")
+    drop_table("job")
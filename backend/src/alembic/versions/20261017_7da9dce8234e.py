@@ -0,0 +1,63 @@
+"""
+20261017_113000
+
+Revision ID: 7da9dce8234e
+Revises: 3a3c1005605f
+Create Date: 2026-10-17 11:30:00.000000+09:00
+"""
+
+from collections.abc import Sequence
+
+from alembic.op import execute
+
+revision: str = "7da9dce8234e"
+down_revision: str | Sequence[str] | None = "3a3c1005605f"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    # Consumed by src.caches.config_node_tree.ConfigNodeTreeCache. autoinstall_config is left out to stay below the 8000 bytes payload limit.
+    execute(
+        """
+            CREATE OR REPLACE FUNCTION notify_confignode_changed()
+            RETURNS trigger
+            LANGUAGE plpgsql
+            AS $$
+            DECLARE
+                changed confignode;
+            BEGIN
+                IF TG_OP = 'DELETE' THEN
+                    changed := OLD;
+                ELSE
+                    changed := NEW;
+                END IF;
+                PERFORM pg_notify(
+                    'confignode_changed',
+                    json_build_object(
+                        'op', TG_OP,
+                        'id', changed.id,
+                        'parent_id', changed.parent_id,
+                        'name', changed.name,
+                        'created_at', changed.created_at,
+                        'updated_at', changed.updated_at
+                    )::text
+                );
+                RETURN NULL;
+            END;
+            $$;
+        """
+    )
+    execute(
+        """
+            CREATE TRIGGER trg_notify_confignode_changed
+            AFTER INSERT OR UPDATE OR DELETE ON confignode
+            FOR EACH ROW
+            EXECUTE FUNCTION notify_confignode_changed();
+        """
+    )
+
+
+def downgrade() -> None:
+    execute("DROP TRIGGER IF EXISTS trg_notify_confignode_changed ON confignode;")
+    execute("DROP FUNCTION IF EXISTS notify_confignode_changed()")
@@ -0,0 +1,49 @@
+"""
+20261017_150000
+
+Revision ID: a8171ec19bc3
+Revises: 2cff0265b988
+Create Date: 2026-10-17 15:00:00.000000+09:00
+"""
+
+from collections.abc import Sequence
+
+from alembic.op import alter_column, create_index, drop_index, f
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlmodel.sql.sqltypes import AutoString
+
+revision: str = "a8171ec19bc3"
+down_revision: str | Sequence[str] | None = "2cff0265b988"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    alter_column(
+        "confignode",
+        "autoinstall_config",
+        existing_type=AutoString(),
+        type_=JSONB(),
+        existing_nullable=False,
+        postgresql_using="autoinstall_config::jsonb",
+    )
+    create_index(
+        f("ix_confignode_autoinstall_config"),
+        "confignode",
+        ["autoinstall_config"],
+        unique=False,
+        postgresql_using="gin",
+        postgresql_ops={"autoinstall_config": "jsonb_path_ops"},
+    )
+
+
+def downgrade() -> None:
+    drop_index(f("ix_confignode_autoinstall_config"), table_name="confignode", postgresql_using="gin")
+    alter_column(
+        "confignode",
+        "autoinstall_config",
+        existing_type=JSONB(),
+        type_=AutoString(),
+        existing_nullable=False,
+        postgresql_using="autoinstall_config::text",
+    )
@@ -0,0 +1,51 @@
+"""
+20261017_130000
+
+Revision ID: f02a65a64617
+Revises: 7da9dce8234e
+Create Date: 2026-10-17 13:00:00.000000+09:00
+"""
+
+from collections.abc import Sequence
+
+from alembic.op import create_index, create_table, drop_index, drop_table, execute, f
+from sqlalchemy.sql.schema import Column, ForeignKeyConstraint, PrimaryKeyConstraint
+from sqlalchemy.sql.sqltypes import Integer, Uuid
+
+revision: str = "f02a65a64617"
+down_revision: str | Sequence[str] | None = "7da9dce8234e"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    create_table(
+        "confignodeclosure",
+        Column("ancestor_id", Uuid(), nullable=False),
+        Column("descendant_id", Uuid(), nullable=False),
+        Column("depth", Integer(), nullable=False),
+        ForeignKeyConstraint(["ancestor_id"], ["confignode.id"], name=f("fk_confignodeclosure_ancestor_id_confignode"), ondelete="CASCADE"),
+        ForeignKeyConstraint(["descendant_id"], ["confignode.id"], name=f("fk_confignodeclosure_descendant_id_confignode"), ondelete="CASCADE"),
+        PrimaryKeyConstraint("ancestor_id", "descendant_id", name=f("pk_confignodeclosure")),
+    )
+    create_index(f("ix_confignodeclosure_descendant_id"), "confignodeclosure", ["descendant_id"], unique=False)
+    # Backfill from parent_id. Nodes that are already part of a cycle only keep the pairs before the cycle closes.
+    execute(
+        """
+            INSERT INTO confignodeclosure (ancestor_id, descendant_id, depth)
+            WITH RECURSIVE walk(ancestor_id, descendant_id, depth) AS (
+                SELECT id, id, 0 FROM confignode
+                UNION ALL
+                SELECT node.parent_id, walk.descendant_id, walk.depth + 1
+                FROM walk JOIN confignode AS node ON node.id = walk.ancestor_id
+                WHERE node.parent_id IS NOT NULL
+            ) CYCLE ancestor_id SET is_cycle USING visited
+            SELECT ancestor_id, descendant_id, depth FROM walk WHERE NOT is_cycle
+            ON CONFLICT DO NOTHING;
+        """
+    )
+
+
+def downgrade() -> None:
+    drop_index(f("ix_confignodeclosure_descendant_id"), table_name="confignodeclosure")
+    drop_table("confignodeclosure")
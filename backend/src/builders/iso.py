@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+from asyncio import to_thread
+from collections.abc import Iterator
+from contextlib import suppress
+from datetime import UTC, datetime
+from hashlib import md5, sha256
+from json import dumps
+from os import stat_result
+from pathlib import Path
+from re import MULTILINE, compile, escape
+from typing import NamedTuple
+from uuid import uuid4
+
+from pydantic import ValidationError
+from src.consts.errors import ClientError
+from src.schemas.iso_build import IsoBuildManifest, IsoBuildPatch, IsoBuildRequest
+from src.settings import IsoBuildSetting
+from src.utils.checksumlib import cached_file_sha256, indexed_file_sha256
+from src.utils.isolib import IsoImage, IsoOverlay, IsoPatch, read_overlay
+
+GRUB_CFG_PATH = "boot/grub/grub.cfg"
+MD5SUM_PATH = "md5sum.txt"
+BUILD_DIR_NAME = "builds"
+
+GRUB_LINUX_PATTERN = compile(rb"^( *linux\s+/casper/vmlinuz)\s+---", MULTILINE)
+
+
+def patch_grub_cfg(content: bytes, nocloud_url: str) -> bytes:
+    # Boots the installer in autoinstall mode, with its config served by the NoCloud routes for the machine's DMI serial number.
+    # grub treats an unescaped ';' as a command separator.
+    args = f"autoinstall ds=nocloud-net\\;s={nocloud_url}__dmi.system-serial-number__/ ip=dhcp cloud-config-url=/dev/null".encode()
+    patched, count = GRUB_LINUX_PATTERN.subn(lambda match: match[1] + b" " + args + b" ---", content)
+    if not count:
+        raise ValueError(f"{GRUB_CFG_PATH} has no /casper/vmlinuz boot entry to patch.")
+    return patched
+
+
+def patch_md5sum(content: bytes, path: str, data: bytes) -> bytes:
+    digest = md5(data, usedforsecurity=False).hexdigest().encode()
+    return compile(rb"^[0-9a-f]{32}(\s+\./" + escape(path.encode()) + rb")$", MULTILINE).sub(lambda match: digest + match[1], content)
+
+
+def read_patched_boot_files(base_iso: Path, nocloud_url: str) -> dict[str, bytes]:
+    with IsoImage(base_iso) as image:
+        grub_cfg = patch_grub_cfg(image.read_file(GRUB_CFG_PATH), nocloud_url)
+        md5sum = patch_md5sum(image.read_file(MD5SUM_PATH), GRUB_CFG_PATH, grub_cfg)
+    return {GRUB_CFG_PATH: grub_cfg, MD5SUM_PATH: md5sum}
+
+
+class IsoBuildSource(NamedTuple):
+    base_iso: Path
+    base_iso_stat: stat_result
+    nocloud_url: str
+    files: dict[str, bytes]
+
+
+class PreparedIsoBuild(NamedTuple):
+    key: str
+    base_iso: Path
+    base_iso_sha256: str
+    nocloud_url: str
+    files: dict[str, bytes]
+
+
+class IsoBuilder:
+    """
+    Builds autoinstall ISOs from a base ISO, cached under `<output_dir>/builds/<key>.json` by their content-addressed build key.
+    A build is only an overlay of the patched boot files over the base ISO, which is streamed with the patches applied when downloaded,
+    so it costs kilobytes of I/O instead of a copy of the whole image.
+    Only the boot files are read to compute the key, so an identical request is answered from the cache without building.
+    The key also needs the base ISO's digest, which costs a read of the whole image unless it is already in the checksum index,
+    so requests only use an indexed digest, and cache misses are hashed and built by ISO_BUILD jobs, see src.tasks.jobs.
+    """
+
+    def __init__(self, setting: IsoBuildSetting) -> None:
+        self.setting = setting
+        self.build_dir = setting.output_dir / BUILD_DIR_NAME
+
+    def manifest_path(self, key: str) -> Path:
+        return self.build_dir / f"{key}.json"
+
+    async def get_artifact(self, key: str) -> IsoBuildManifest | None:
+        with suppress(OSError, ValidationError):
+            manifest = IsoBuildManifest.model_validate_json(await to_thread(self.manifest_path(key).read_bytes))
+            # The patches only apply to the exact base image they were built from.
+            base_iso = self.setting.input_dir / manifest.base_iso_name
+            if await to_thread(cached_file_sha256, base_iso) == manifest.base_iso_sha256:
+                return manifest
+        return None
+
+    def iter_artifact(self, manifest: IsoBuildManifest, start: int = 0, end: int | None = None) -> Iterator[bytes]:
+        patches = [IsoPatch(patch.offset, patch.data) for patch in manifest.patches]
+        with IsoImage(self.setting.input_dir / manifest.base_iso_name) as image:
+            yield from read_overlay(image, patches, manifest.size, start, end)
+
+    def build_key(self, base_iso_sha256: str, nocloud_url: str, files: dict[str, bytes]) -> str:
+        spec = {
+            "base_iso_sha256": base_iso_sha256,
+            "nocloud_url": nocloud_url,
+            "volume_id": self.setting.volume_id,
+            "files": {path: sha256(content).hexdigest() for path, content in files.items()},
+        }
+        return sha256(dumps(spec, sort_keys=True).encode()).hexdigest()
+
+    def source_key(self, source: IsoBuildSource) -> str:
+        # Same as build_key, with the base ISO identified by its stat instead of its digest, to dedupe the ISO_BUILD jobs.
+        stat = source.base_iso_stat
+        base_iso_id = f"{source.base_iso.name}:{stat.st_size}:{stat.st_mtime_ns}:{stat.st_ino}"
+        return self.build_key(base_iso_id, source.nocloud_url, source.files)
+
+    async def read_source(self, request: IsoBuildRequest) -> IsoBuildSource:
+        # Reads the boot files only, so it is cheap enough for the request path.
+        base_iso_name = request.base_iso_name or self.setting.base_iso_name
+        base_iso = self.setting.input_dir / base_iso_name
+        if Path(base_iso_name).name != base_iso_name or not base_iso.is_file():
+            ClientError.RESOURCE_NOT_FOUND(loc=["base_iso_name"], input=base_iso_name).raise_()
+
+        nocloud_url = request.nocloud_url or self.setting.nocloud_url
+        try:
+            files = await to_thread(read_patched_boot_files, base_iso, nocloud_url)
+        except (KeyError, ValueError) as err:
+            ClientError.REQUEST_BODY_INVALID(type="value_error", msg=str(err), loc=["base_iso_name"], input=base_iso_name).raise_()
+        return IsoBuildSource(base_iso=base_iso, base_iso_stat=base_iso.stat(), nocloud_url=nocloud_url, files=files)
+
+    def prepare_with(self, source: IsoBuildSource, base_iso_sha256: str) -> PreparedIsoBuild:
+        key = self.build_key(base_iso_sha256, source.nocloud_url, source.files)
+        return PreparedIsoBuild(
+            key=key,
+            base_iso=source.base_iso,
+            base_iso_sha256=base_iso_sha256,
+            nocloud_url=source.nocloud_url,
+            files=source.files,
+        )
+
+    async def peek(self, source: IsoBuildSource) -> PreparedIsoBuild | None:
+        # None when the base ISO's digest is not indexed yet, i.e. the base ISO would have to be hashed.
+        if base_iso_sha256 := await to_thread(indexed_file_sha256, source.base_iso, source.base_iso_stat):
+            return self.prepare_with(source, base_iso_sha256)
+        return None
+
+    async def prepare(self, request: IsoBuildRequest) -> PreparedIsoBuild:
+        # Hashes the whole base ISO unless its digest is indexed, so it is only called by the ISO_BUILD jobs.
+        source = await self.read_source(request)
+        return self.prepare_with(source, await to_thread(cached_file_sha256, source.base_iso))
+
+    def create_overlay(self, prepared: PreparedIsoBuild) -> tuple[int, list[IsoPatch]]:
+        with IsoImage(prepared.base_iso) as image:
+            overlay = IsoOverlay(image)
+            for path, content in prepared.files.items():
+                overlay.replace_file(path, content)
+            overlay.set_volume_id(self.setting.volume_id)
+            return overlay.size, overlay.get_patches()
+
+    async def build(self, prepared: PreparedIsoBuild) -> IsoBuildManifest:
+        size, patches = await to_thread(self.create_overlay, prepared)
+        manifest = IsoBuildManifest(
+            key=prepared.key,
+            base_iso_name=prepared.base_iso.name,
+            base_iso_sha256=prepared.base_iso_sha256,
+            nocloud_url=prepared.nocloud_url,
+            volume_id=self.setting.volume_id,
+            files={path: sha256(content).hexdigest() for path, content in prepared.files.items()},
+            size=size,
+            patches=[IsoBuildPatch(offset=patch.offset, data=patch.data) for patch in patches],
+            built_at=datetime.now(tz=UTC),
+        )
+
+        self.build_dir.mkdir(parents=True, exist_ok=True)
+        manifest_path = self.manifest_path(prepared.key)
+        # Unique per build, another worker process may be building the same key.
+        temp_path = manifest_path.with_name(f"{manifest_path.name}.{uuid4().hex}.tmp")
+        await to_thread(temp_path.write_text, manifest.model_dump_json(indent=2))
+        temp_path.replace(manifest_path)
+        return manifest
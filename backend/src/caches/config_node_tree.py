@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+from asyncio import sleep
+from collections import defaultdict, deque
+from collections.abc import Iterable, Iterator
+from datetime import datetime
+from json import loads
+from logging import getLogger
+from typing import Literal, NamedTuple, TypedDict
+from uuid import UUID
+
+from psycopg import AsyncConnection, sql
+from psycopg.errors import Error as PsycopgError
+from pydantic import TypeAdapter
+
+logger = getLogger(__name__)
+
+PATH_SEPARATOR = " > "
+
+
+class CachedConfigNode(NamedTuple):
+    id: UUID
+    parent_id: UUID | None
+    name: str
+    created_at: datetime | None
+    updated_at: datetime | None
+
+
+class ConfigNodeNotifyPayload(TypedDict):
+    op: Literal["INSERT", "UPDATE", "DELETE"]
+    id: UUID
+    parent_id: UUID | None
+    name: str
+    created_at: datetime | None
+    updated_at: datetime | None
+
+
+notify_payload_adapter = TypeAdapter(ConfigNodeNotifyPayload)
+
+
+class ConfigNodeTreeCache:
+    """
+    Process-local copy of the ConfigNode tree (without autoinstall_config) and the breadcrumb path of every node.
+    Kept coherent with the database through the NOTIFY_CHANNEL notifications emitted by the confignode trigger.
+    Paths follow ConfigNodeQuery.get_nested_title_cte(): nodes that cannot be reached from a root have no path.
+    """
+
+    NOTIFY_CHANNEL = "confignode_changed"
+    SNAPSHOT_QUERY = "SELECT id, parent_id, name, created_at, updated_at FROM confignode"
+    RECONNECT_INTERVAL = 5.0
+
+    def __init__(self) -> None:
+        self.nodes: dict[UUID, CachedConfigNode] = {}
+        self.children: defaultdict[UUID, set[UUID]] = defaultdict(set)
+        self.paths: dict[UUID, str] = {}
+        self.ready: bool = False
+
+    def load(self, nodes: Iterable[CachedConfigNode]) -> None:
+        self.nodes = {node.id: node for node in nodes}
+        self.children = defaultdict(set)
+        for node in self.nodes.values():
+            if node.parent_id:
+                self.children[node.parent_id].add(node.id)
+
+        self.paths = {}
+        for node in self.nodes.values():
+            if not node.parent_id or node.parent_id not in self.nodes:
+                self._refresh_paths(node.id)
+
+    def iter_paths(self) -> Iterator[tuple[CachedConfigNode, str]]:
+        return ((self.nodes[id], path) for id, path in self.paths.items())
+
+    def upsert(self, node: CachedConfigNode) -> None:
+        old_node = self.nodes.get(node.id)
+        self.nodes[node.id] = node
+        if old_node and (old_node.parent_id, old_node.name) == (node.parent_id, node.name):
+            return
+
+        if old_node and old_node.parent_id:
+            self.children[old_node.parent_id].discard(node.id)
+        if node.parent_id:
+            self.children[node.parent_id].add(node.id)
+        self._refresh_paths(node.id)
+
+    def remove(self, id: UUID) -> None:
+        if not (node := self.nodes.pop(id, None)):
+            return
+
+        if node.parent_id:
+            self.children[node.parent_id].discard(id)
+        self.paths.pop(id, None)
+        # Orphaned children are treated as roots, same as the recursive CTE.
+        for child_id in self.children.pop(id, set()):
+            self._refresh_paths(child_id)
+
+    def _is_reachable_from_root(self, id: UUID) -> bool:
+        visited: set[UUID] = set()
+        next_id: UUID | None = id
+        while next_id in self.nodes:
+            if next_id in visited:
+                return False
+            visited.add(next_id)
+            next_id = self.nodes[next_id].parent_id
+        return True
+
+    def _refresh_paths(self, id: UUID) -> None:
+        """Recompute the path of the given node and its descendants only."""
+        node = self.nodes[id]
+        if not node.parent_id or node.parent_id not in self.nodes:
+            root_path: str | None = node.name
+        elif self._is_reachable_from_root(id) and (parent_path := self.paths.get(node.parent_id)) is not None:
+            root_path = parent_path + PATH_SEPARATOR + node.name
+        else:
+            root_path = None
+
+        visited: set[UUID] = set()
+        queue: deque[tuple[UUID, str | None]] = deque([(id, root_path)])
+        while queue:
+            node_id, path = queue.popleft()
+            if node_id in visited:
+                continue
+            visited.add(node_id)
+
+            if path is None:
+                self.paths.pop(node_id, None)
+            else:
+                self.paths[node_id] = path
+
+            for child_id in self.children.get(node_id, ()):
+                queue.append((child_id, None if path is None else path + PATH_SEPARATOR + self.nodes[child_id].name))
+
+    def apply_notification(self, payload: str) -> None:
+        data = notify_payload_adapter.validate_python(loads(payload))
+        if data["op"] == "DELETE":
+            self.remove(data["id"])
+        else:
+            self.upsert(CachedConfigNode(data["id"], data["parent_id"], data["name"], data["created_at"], data["updated_at"]))
+
+    async def listen(self, dsn: str) -> None:
+        """Keeps the cache in sync until cancelled. Any missed notification is covered by reloading on reconnect."""
+        while True:
+            try:
+                async with await AsyncConnection.connect(dsn, autocommit=True) as conn:
+                    # LISTEN before the snapshot, so that no change between them can be missed.
+                    await conn.execute(sql.SQL("LISTEN {}").format(sql.Identifier(self.NOTIFY_CHANNEL)))
+                    async with conn.cursor() as cursor:
+                        await cursor.execute(self.SNAPSHOT_QUERY)
+                        self.load(CachedConfigNode(*row) for row in await cursor.fetchall())
+                    self.ready = True
+
+                    async for notify in conn.notifies():
+                        self.apply_notification(notify.payload)
+            except (PsycopgError, OSError, ValueError) as err:
+                logger.error("ConfigNode tree cache listener failed, falling back to database queries", exc_info=err)
+            finally:
+                self.ready = False
+
+            await sleep(self.RECONNECT_INTERVAL)
@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+from collections.abc import Mapping
+from json import dumps
+from typing import NamedTuple, cast
+
+from sqlmodel import SQLModel
+from src.utils.httplib import make_etag
+from src.utils.third_parties.jsonschemalib import Schema
+from src.utils.third_parties.sqlmodellib import SchemaInfo, get_json_schema
+from src.validators.autoinstall import get_autoinstall_json_schema
+
+
+class SerializedJSONSchema(NamedTuple):
+    content: bytes
+    etag: str
+
+
+class JSONSchemaCache:
+    """
+    JSON schemas served by json_schema_router, serialized once at startup.
+    They only change with the code, so every request after that is a dict lookup (or a 304).
+    """
+
+    def __init__(self) -> None:
+        self.schemas: dict[str, SerializedJSONSchema] = {}
+
+    def add(self, name: str, schema: object) -> None:
+        content = dumps(schema, ensure_ascii=False, separators=(",", ":")).encode()
+        self.schemas[name] = SerializedJSONSchema(content=content, etag=make_etag(content))
+
+    def get(self, name: str) -> SerializedJSONSchema | None:
+        return self.schemas.get(name)
+
+    @classmethod
+    def from_models(cls, models: Mapping[str, type[SQLModel]]) -> JSONSchemaCache:
+        cache = cls()
+        for name, model in models.items():
+            cache.add(name.lower(), get_json_schema(model))
+        cache.add("autoinstall", SchemaInfo(schema=cast(Schema, get_autoinstall_json_schema()), ui_schema={}))
+        return cache
@@ -169,6 +169,7 @@ class ClientError(ErrorEnum):
         "JSON_DECODE_ERROR": ErrorStructDict(status_code=status.HTTP_400_BAD_REQUEST),
         "REQUEST_TOO_FREQUENT": ErrorStructDict(status_code=status.HTTP_429_TOO_MANY_REQUESTS),
         "REQUEST_BODY_EMPTY": ErrorStructDict(status_code=status.HTTP_400_BAD_REQUEST),
+        "JOB_ALREADY_FINISHED": ErrorStructDict(status_code=status.HTTP_409_CONFLICT),
     }
 
     API_NOT_FOUND = "요청하신 경로를 찾을 수 없어요, 새로고침 후 다시 시도해주세요."
@@ -180,3 +181,5 @@ class ClientError(ErrorEnum):
     REQUEST_BODY_LACK = "입력하신 정보 중 누락된 부분이 있어요, 다시 입력해주세요."
     REQUEST_BODY_INVALID = "입력하신 정보가 올바르지 않아요, 다시 입력해주세요."
     REQUEST_BODY_CONTAINS_INVALID_CHAR = "입력 불가능한 문자가 포함되어 있어요, 다시 입력해주세요."
+
+    JOB_ALREADY_FINISHED = "이미 끝난 작업이에요."
@@ -11,3 +11,10 @@ class OpenAPITag(enum.StrEnum):
 
     CONFIG_NODE = enum.auto()
     DEVICE = enum.auto()
+
+    NO_CLOUD = enum.auto()
+
+    ISO_BUILD = enum.auto()
+    ARTIFACT = enum.auto()
+
+    JOB = enum.auto()
@@ -3,7 +3,12 @@ from typing import Annotated, cast
 
 from fastapi import Depends, FastAPI, Request
 from sqlmodel.ext.asyncio.session import AsyncSession as SQLModelAsyncSession
+from src.builders.iso import IsoBuilder
+from src.caches.config_node_tree import ConfigNodeTreeCache
+from src.caches.json_schema import JSONSchemaCache
+from src.executors.process_pool import ProcessPoolJobExecutor
 from src.settings import ProjectSetting
+from src.stores.chunk import ChunkStore
 
 
 def config_di(request: Request) -> Generator[ProjectSetting, None, None]:
@@ -13,7 +18,25 @@ def config_di(request: Request) -> Generator[ProjectSetting, None, None]:
 configDI = Annotated[ProjectSetting, Depends(config_di)]
 
 
-async def db_session_di(config: configDI) -> AsyncGenerator[SQLModelAsyncSession, None]:
+READ_ONLY_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+
+async def db_read_only_session_di(config: configDI) -> AsyncGenerator[SQLModelAsyncSession, None]:
+    # Nothing to commit, the READ ONLY transaction is rolled back when the session is closed.
+    async with config.sqlalchemy.async_read_only_session_maker() as session:
+        yield session
+
+
+dbReadOnlyDI = Annotated[SQLModelAsyncSession, Depends(db_read_only_session_di)]
+
+
+async def db_session_di(request: Request, config: configDI) -> AsyncGenerator[SQLModelAsyncSession, None]:
+    # Safe methods never write, so they are served by read-only sessions and skip the commit.
+    if request.method in READ_ONLY_METHODS:
+        async with config.sqlalchemy.async_read_only_session_maker() as read_only_session:
+            yield read_only_session
+        return
+
     async with config.sqlalchemy.async_session_maker() as session:
         try:
             yield session
@@ -26,3 +49,38 @@ async def db_session_di(config: configDI) -> AsyncGenerator[SQLModelAsyncSession
 
 
 dbDI = Annotated[SQLModelAsyncSession, Depends(db_session_di)]
+
+
+def config_node_tree_cache_di(request: Request) -> ConfigNodeTreeCache | None:
+    return cast(ConfigNodeTreeCache | None, getattr(cast(FastAPI, request.app).state, "config_node_tree_cache", None))
+
+
+configNodeTreeCacheDI = Annotated[ConfigNodeTreeCache | None, Depends(config_node_tree_cache_di)]
+
+
+def json_schema_cache_di(request: Request) -> JSONSchemaCache:
+    return cast(JSONSchemaCache, cast(FastAPI, request.app).state.json_schema_cache)
+
+
+jsonSchemaCacheDI = Annotated[JSONSchemaCache, Depends(json_schema_cache_di)]
+
+
+def job_executor_di(request: Request) -> ProcessPoolJobExecutor | None:
+    return cast(ProcessPoolJobExecutor | None, getattr(cast(FastAPI, request.app).state, "job_executor", None))
+
+
+jobExecutorDI = Annotated[ProcessPoolJobExecutor | None, Depends(job_executor_di)]
+
+
+def iso_builder_di(request: Request) -> IsoBuilder:
+    return cast(IsoBuilder, cast(FastAPI, request.app).state.iso_builder)
+
+
+isoBuilderDI = Annotated[IsoBuilder, Depends(iso_builder_di)]
+
+
+def chunk_store_di(config: configDI) -> ChunkStore:
+    return ChunkStore(config.iso.mirror_dir)
+
+
+chunkStoreDI = Annotated[ChunkStore, Depends(chunk_store_di)]
@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+from asyncio import CancelledError, Semaphore, Task, create_task, gather, sleep
+from collections.abc import AsyncIterator, Callable, Coroutine, Mapping, Sequence
+from contextlib import asynccontextmanager, suppress
+from logging import getLogger
+from os import getpid
+from socket import gethostname
+from typing import Any
+from uuid import uuid4
+
+from fastapi import HTTPException
+from fastapi.exceptions import RequestValidationError
+from src.builders.iso import IsoBuilder
+from src.caches.config_node_tree import ConfigNodeTreeCache
+from src.executors.process_pool import ProcessPoolJobExecutor
+from src.models import Job
+from src.repositories.job import JobRepository
+from src.schemas.job import JobStatus, JobType
+from src.settings import ProjectSetting
+
+logger = getLogger(__name__)
+
+JobHandler = Callable[["JobContext"], Coroutine[Any, Any, dict[str, Any] | None]]
+
+
+def describe_error(err: Exception) -> str:
+    # ClientErrors raised by the services keep their user-facing messages.
+    details = err.errors() if isinstance(err, RequestValidationError) else err.detail if isinstance(err, HTTPException) else None
+    if isinstance(details, Sequence) and not isinstance(details, str):
+        return " ".join(str(detail.get("msg") if isinstance(detail, dict) else getattr(detail, "msg", detail)) for detail in details)
+    return str(err) or err.__class__.__name__
+
+
+class JobContext:
+    """What a job handler gets: its job, the runner's shared resources, and a progress setter written by the heartbeats."""
+
+    def __init__(self, job: Job, runner: BackgroundJobRunner) -> None:
+        self.job = job
+        self.runner = runner
+        self.progress = self.written_progress = job.progress
+
+    @property
+    def config(self) -> ProjectSetting:
+        return self.runner.config
+
+    def report_progress(self, done: float, total: float = 1.0) -> None:
+        # Only kept in memory, so it is cheap enough to call on every chunk.
+        if total > 0:
+            self.progress = min(max(done / total, 0.0), 1.0)
+
+    def unwritten_progress(self) -> float | None:
+        return None if self.progress == self.written_progress else self.progress
+
+
+class BackgroundJobRunner:
+    """
+    Runs the jobs queued in the job table, outside of any request, with at most `concurrency[type]` jobs of each type at once.
+    Several runners (uvicorn workers, `run-jobs` processes, hosts) can share the table, as jobs are claimed with SKIP LOCKED.
+
+    A claimed job is leased to the runner for lease_timeout seconds, and the lease is renewed by a heartbeat every heartbeat_interval,
+    which also writes the latest progress, so a job costs one UPDATE per heartbeat however often it reports progress.
+    If the runner dies, the lease expires and another runner claims the job again, up to max_attempts times.
+    The handler is cancelled when its heartbeat finds the job is not its own anymore, i.e. cancelled through the API or claimed by another runner.
+    On shutdown, the running jobs are put back in the queue.
+    """
+
+    def __init__(
+        self,
+        config: ProjectSetting,
+        handlers: Mapping[JobType, JobHandler],
+        executor: ProcessPoolJobExecutor | None = None,
+        tree_cache: ConfigNodeTreeCache | None = None,
+        iso_builder: IsoBuilder | None = None,
+    ) -> None:
+        self.config = config
+        self.setting = config.job
+        self.handlers = handlers
+        self.executor = executor
+        self.tree_cache = tree_cache
+        self.iso_builder = iso_builder or IsoBuilder(config.iso)
+
+        self.worker_id = f"{gethostname()}:{getpid()}:{uuid4().hex[:8]}"
+        self.slots = {type: Semaphore(self.setting.concurrency.get(type, 1)) for type in handlers}
+        self.loops: list[Task[None]] = []
+        self.running: set[Task[None]] = set()
+        self.stopping = False
+
+    @asynccontextmanager
+    async def repository(self) -> AsyncIterator[JobRepository]:
+        # Every state change is its own short transaction, so no connection is held while a job runs.
+        async with self.config.sqlalchemy.async_session_maker() as session:
+            yield JobRepository(session=session)
+            await session.commit()
+
+    async def start(self) -> None:
+        self.loops = [create_task(self.poll(type)) for type in self.handlers]
+        self.loops.append(create_task(self.reap()))
+
+    async def shutdown(self) -> None:
+        self.stopping = True
+        for task in (*self.loops, *self.running):
+            task.cancel()
+        await gather(*self.loops, *self.running, return_exceptions=True)
+
+    async def poll(self, type: JobType) -> None:
+        slots = self.slots[type]
+        while True:
+            await slots.acquire()
+            job = None
+            try:
+                async with self.repository() as repository:
+                    job = await repository.claim(type, self.worker_id, self.setting.lease_timeout, self.setting.max_attempts)
+            except Exception as err:
+                logger.warning("Failed to claim a %s job", type, exc_info=err)
+
+            if job is None:
+                slots.release()
+                await sleep(self.setting.poll_interval)
+                continue
+
+            task = create_task(self.run(job))
+            self.running.add(task)
+            task.add_done_callback(self.running.discard)
+            task.add_done_callback(lambda _: slots.release())
+
+    async def reap(self) -> None:
+        while True:
+            await sleep(self.setting.lease_timeout)
+            try:
+                async with self.repository() as repository:
+                    if failed := await repository.fail_abandoned(self.setting.max_attempts):
+                        logger.warning("Failed %d job(s) abandoned by their workers", failed)
+            except Exception as err:
+                logger.warning("Failed to reap the abandoned jobs", exc_info=err)
+
+    async def heartbeat(self, context: JobContext, work: Task[dict[str, Any] | None]) -> None:
+        while True:
+            await sleep(self.setting.heartbeat_interval)
+            progress = context.unwritten_progress()
+            try:
+                async with self.repository() as repository:
+                    owned = await repository.heartbeat(context.job.id, self.worker_id, self.setting.lease_timeout, progress)
+            except Exception as err:
+                # Retried on the next beat, the lease outlives a few missed ones.
+                logger.warning("Failed to renew the lease of job %s", context.job.id, exc_info=err)
+                continue
+            if progress is not None:
+                context.written_progress = progress
+            if not owned:
+                logger.info("Job %s was cancelled or taken over, stopping it", context.job.id)
+                work.cancel()
+                return
+
+    async def run(self, job: Job) -> None:
+        context = JobContext(job, self)
+        work = create_task(self.handlers[job.type](context))
+        heartbeat = create_task(self.heartbeat(context, work))
+        result: dict[str, Any] | None = None
+        error: str | None = None
+        try:
+            result = await work
+            status = JobStatus.SUCCEEDED
+        except CancelledError:
+            if self.stopping:
+                with suppress(Exception):
+                    async with self.repository() as repository:
+                        await repository.release(job.id, self.worker_id)
+                raise
+            status = JobStatus.CANCELLED
+        except Exception as err:
+            logger.exception("Job %s (%s) failed", job.id, job.type)
+            status, error = JobStatus.FAILED, describe_error(err)
+        finally:
+            heartbeat.cancel()
+
+        try:
+            # No-op if the job is not this runner's anymore, e.g. it was cancelled through the API.
+            async with self.repository() as repository:
+                await repository.finish(job.id, self.worker_id, status, result=result, error=error)
+        except Exception as err:
+            # The lease expires and the job is retried by another runner.
+            logger.warning("Failed to record the result of job %s", job.id, exc_info=err)
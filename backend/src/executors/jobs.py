@@ -0,0 +1,31 @@
+from typing import Any
+
+from pydantic import ValidationError
+from pydantic_core import ErrorDetails
+from src.utils.cloudinitlib import render_user_data
+from src.validators.autoinstall import validate_autoinstall
+
+# Jobs run by ProcessPoolJobExecutor. They must be module-level functions, as they are pickled by reference,
+# and only take and return plain (picklable) values.
+
+
+def validate_autoinstall_configs(configs: list[dict[str, Any]]) -> None:
+    # Raises the ValidationError of the first invalid config.
+    for config in configs:
+        validate_autoinstall(config)
+
+
+def render_user_data_batch(configs: list[dict[str, Any]]) -> list[bytes]:
+    return [render_user_data(validate_autoinstall(config).export(mode="json")) for config in configs]
+
+
+def lint_autoinstall_configs(configs: list[dict[str, Any]]) -> list[list[ErrorDetails] | None]:
+    # Unlike validate_autoinstall_configs, every config is checked, and the errors are returned (without inputs) in the same order.
+    results: list[list[ErrorDetails] | None] = []
+    for config in configs:
+        try:
+            validate_autoinstall(config)
+            results.append(None)
+        except ValidationError as err:
+            results.append(err.errors(include_url=False, include_context=False, include_input=False))
+    return results
@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+from asyncio import Semaphore, gather, get_running_loop, wait_for, wrap_future
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from importlib import import_module
+from logging import getLogger
+from multiprocessing import get_context
+from typing import ParamSpec, TypeVar
+
+logger = getLogger(__name__)
+
+P = ParamSpec("P")
+T = TypeVar("T")
+
+# Imported by every worker before its first job, so that no job pays for building the pydantic validators.
+WARM_UP_MODULES = ("src.executors.jobs",)
+
+
+def warm_up() -> None:
+    for module in WARM_UP_MODULES:
+        import_module(module)
+
+
+class ProcessPoolJobExecutor:
+    """
+    Runs CPU-bound jobs (autoinstall validation and rendering) in worker processes, so that they never block the event loop.
+    At most max_pending jobs are queued or running at once; the others wait for a slot before being submitted.
+    A job that does not finish within the timeout raises TimeoutError, and is cancelled if it has not started yet.
+    Otherwise it keeps its slot until its worker is done with it.
+    """
+
+    def __init__(self, workers: int, max_pending: int, timeout: float) -> None:
+        self.workers = workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.pool: ProcessPoolExecutor | None = None
+        self.slots: Semaphore | None = None
+
+    def _create_pool(self) -> ProcessPoolExecutor:
+        # Forking a process running an event loop and DB connections is unsafe, so workers are spawned.
+        return ProcessPoolExecutor(max_workers=self.workers, mp_context=get_context("spawn"), initializer=warm_up)
+
+    async def start(self) -> None:
+        self.pool = self._create_pool()
+        self.slots = Semaphore(self.max_pending)
+
+        # Jobs submitted together before any of them completes make the pool spawn every worker.
+        loop = get_running_loop()
+        await gather(*(loop.run_in_executor(self.pool, warm_up) for _ in range(self.workers)))
+
+    def shutdown(self) -> None:
+        if self.pool:
+            self.pool.shutdown(wait=False, cancel_futures=True)
+            self.pool = None
+
+    async def run(self, fn: Callable[P, T], *args: P.args, **kwargs: P.kwargs) -> T:
+        if not (self.pool and self.slots):
+            raise RuntimeError("ProcessPoolJobExecutor is not started")
+
+        # The slot is held until the job really finishes, not only until run() returns on a timeout,
+        # so that jobs still running in a worker keep counting against max_pending.
+        slots, loop = self.slots, get_running_loop()
+        await slots.acquire()
+        pool = self.pool
+        try:
+            future = pool.submit(fn, *args, **kwargs)
+        except BaseException:
+            slots.release()
+            raise
+        future.add_done_callback(lambda _: loop.call_soon_threadsafe(slots.release))
+
+        try:
+            return await wait_for(wrap_future(future), timeout=self.timeout)
+        except TimeoutError:
+            future.cancel()
+            logger.error("Job %s timed out after %.1f seconds", fn.__qualname__, self.timeout)
+            raise
+        except BrokenProcessPool:
+            # A worker died (e.g. OOM killed), every pending job of the pool fails with it. Start over with a new pool,
+            # only once: the other jobs failing with the same pool must not shut down its replacement.
+            if self.pool is pool:
+                logger.exception("Process pool is broken, recreating it")
+                pool.shutdown(wait=False, cancel_futures=True)
+                self.pool = self._create_pool()
+            raise
+
+
+async def run_job(executor: ProcessPoolJobExecutor | None, fn: Callable[P, T], *args: P.args, **kwargs: P.kwargs) -> T:
+    # Without an executor (e.g. CLI commands), the job runs inline.
+    if executor is None:
+        return fn(*args, **kwargs)
+    return await executor.run(fn, *args, **kwargs)
@@ -1,14 +1,18 @@
 from datetime import datetime
 from re import Pattern, compile
 from secrets import token_hex
-from typing import Annotated, Literal, NamedTuple, Unpack
+from typing import Annotated, Any, Literal, NamedTuple, Unpack
 from uuid import UUID, uuid4
 
 from pydantic import ConfigDict
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import declared_attr
+from sqlalchemy.sql.expression import text
 from sqlalchemy.sql.functions import func
-from sqlalchemy.sql.schema import MetaData
-from sqlmodel import Field, SQLModel
+from sqlalchemy.sql.schema import Index, MetaData
+from sqlmodel import AutoString, Field, SQLModel
+from src.schemas.job import JobStatus, JobType
+from src.utils.third_parties.sqlalchemylib import JSONBText
 
 
 class NCType(NamedTuple):
@@ -95,7 +99,34 @@ class ConfigNode(DefaultModelMixin, table=True):
     name: Annotated[str, Field(nullable=False, index=True, unique=True)]
     parent_id: Annotated[UUID | None, Field(foreign_key="confignode.id", nullable=True, default=None)]
 
-    autoinstall_config: Annotated[str, Field(nullable=False)]  # JSON serialized value
+    autoinstall_config: Annotated[str, Field(nullable=False, sa_type=JSONBText)]  # JSON serialized value, stored as JSONB
+
+    __table_args__ = (
+        # Keyset pagination in RepositoryImpl.order_by order, and name prefix search
+        Index("ix_confignode_updated_at_id", "updated_at", "id"),
+        Index("ix_confignode_name_pattern", "name", postgresql_ops={"name": "text_pattern_ops"}),
+        # Containment (@>) and jsonpath (@?, @@) queries on the config
+        Index(
+            "ix_confignode_autoinstall_config",
+            "autoinstall_config",
+            postgresql_using="gin",
+            postgresql_ops={"autoinstall_config": "jsonb_path_ops"},
+        ),
+    )
+
+
+class ConfigNodeClosure(SQLModel, table=True):
+    # Every (ancestor, descendant) pair of the ConfigNode tree, including (node, node) with depth 0.
+    # Maintained by ConfigNodeService, so that hierarchy queries become index scans instead of recursive CTEs.
+    ancestor_id: Annotated[UUID, Field(foreign_key="confignode.id", ondelete="CASCADE", primary_key=True)]
+    descendant_id: Annotated[UUID, Field(foreign_key="confignode.id", ondelete="CASCADE", primary_key=True, index=True)]
+    depth: Annotated[int, Field(nullable=False)]
+
+    metadata = default_model_mixin_metadata
+
+    @declared_attr  # type: ignore[arg-type]
+    def __tablename__(cls) -> str:
+        return cls.__name__.lower()
 
 
 class Device(DefaultModelMixin, table=True):
@@ -110,4 +141,57 @@ class Device(DefaultModelMixin, table=True):
         ),
     ]
 
-    config_node_id: Annotated[UUID, Field(foreign_key="confignode.id", nullable=False)]
+    config_node_id: Annotated[UUID, Field(foreign_key="confignode.id", nullable=False, index=True)]
+
+    __table_args__ = (
+        # Keyset pagination in RepositoryImpl.order_by order, and name prefix search
+        Index("ix_device_updated_at_id", "updated_at", "id"),
+        Index("ix_device_name_pattern", "name", postgresql_ops={"name": "text_pattern_ops"}),
+    )
+
+
+class RenderedConfig(DefaultModelMixin, table=True):
+    # Pre-rendered NoCloud documents of a Device, refreshed whenever the Device or its ConfigNode chain changes.
+    device_id: Annotated[UUID, Field(foreign_key="device.id", ondelete="CASCADE", nullable=False, index=True, unique=True)]
+    identifier: Annotated[str, Field(nullable=False, index=True, unique=True)]  # Same as Device.identifier
+
+    user_data: Annotated[bytes, Field(nullable=False)]
+    meta_data: Annotated[bytes, Field(nullable=False)]
+    content_hash: Annotated[str, Field(nullable=False)]  # SHA-256 hex digest of user_data and meta_data
+
+
+JOB_DEDUPE_INDEX_PREDICATE = "status IN ('pending', 'running') AND dedupe_key IS NOT NULL"
+
+
+class Job(DefaultModelMixin, table=True):
+    # Long-running task, run outside of the request path by src.executors.background.BackgroundJobRunner.
+    type: Annotated[JobType, Field(nullable=False, sa_type=AutoString)]
+    status: Annotated[JobStatus, Field(nullable=False, sa_type=AutoString)] = JobStatus.PENDING
+    # At most one pending or running job per (type, dedupe_key), e.g. the build key of an ISO build.
+    dedupe_key: Annotated[str | None, Field(nullable=True)] = None
+
+    payload: Annotated[dict[str, Any], Field(nullable=False, sa_type=JSONB, default_factory=dict)]
+    result: Annotated[dict[str, Any] | None, Field(nullable=True, sa_type=JSONB)] = None
+    error: Annotated[str | None, Field(nullable=True)] = None
+    progress: Annotated[float, Field(nullable=False)] = 0.0  # 0 to 1, flushed with the heartbeats
+
+    # A running job belongs to worker_id until lease_expires_at, which its heartbeats keep pushing back.
+    # Once expired, e.g. after a crash, any worker can claim the job again until it has been attempted max_attempts times.
+    attempts: Annotated[int, Field(nullable=False)] = 0
+    worker_id: Annotated[str | None, Field(nullable=True)] = None
+    lease_expires_at: Annotated[datetime | None, Field(nullable=True)] = None
+    started_at: Annotated[datetime | None, Field(nullable=True)] = None
+    finished_at: Annotated[datetime | None, Field(nullable=True)] = None
+
+    __table_args__ = (
+        Index("ix_job_updated_at_id", "updated_at", "id"),
+        # Claim order of the pending jobs, and lookup of the expired leases
+        Index("ix_job_type_status_created_at", "type", "status", "created_at"),
+        Index(
+            "uq_job_type_dedupe_key",
+            "type",
+            "dedupe_key",
+            unique=True,
+            postgresql_where=text(JOB_DEDUPE_INDEX_PREDICATE),
+        ),
+    )
@@ -1,37 +1,61 @@
-from sqlalchemy.dialects.postgresql import array
-from sqlalchemy.orm import aliased
-from sqlalchemy.sql.elements import literal
+from collections.abc import Collection
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy.dialects.postgresql import JSONB, JSONPATH, aggregate_order_by
+from sqlalchemy.sql.elements import ColumnElement, literal
+from sqlalchemy.sql.expression import cast, type_coerce
 from sqlalchemy.sql.functions import func
 from sqlalchemy.sql.selectable import CTE
-from sqlmodel.sql.expression import any_, col, not_, or_, select
-from src.models import ConfigNode
+from sqlmodel.sql.expression import Select, SelectOfScalar, col, desc, select
+from src.models import ConfigNode, ConfigNodeClosure
 
 
 class ConfigNodeQuery:
     @staticmethod
-    def get_nested_title_cte() -> CTE:
-        parent = aliased(ConfigNode, name="parent")
-        children = aliased(ConfigNode, name="children")
-
-        seed = (
-            select(
-                ConfigNode.id,
-                ConfigNode.parent_id,
-                col(ConfigNode.name).label("path"),
-                array([ConfigNode.id]).label("visited"),
-            )
-            .select_from(ConfigNode)
-            .outerjoin(parent, col(ConfigNode.parent_id) == col(parent.id))
-            .where(or_(col(ConfigNode.parent_id).is_(None), col(parent.id).is_(None)))
-            .cte("tree", recursive=True)
-        )
-        return seed.union_all(
+    def get_nested_title_cte(ids: Collection[UUID] | None = None) -> CTE:
+        query: Select[Any] = (
             select(
-                children.id,
-                children.parent_id,
-                func.concat_ws(literal(" > "), col(seed.c.path), col(children.name)).label("path"),
-                func.array_cat(seed.c.visited, array([children.id])).label("visited"),
+                col(ConfigNodeClosure.descendant_id).label("id"),
+                func.string_agg(col(ConfigNode.name), aggregate_order_by(literal(" > "), desc(ConfigNodeClosure.depth))).label("path"),
             )
-            .join(seed, col(children.parent_id) == col(seed.c.id))
-            .where(not_(children.id == any_(seed.c.visited)))
+            .join(ConfigNode, col(ConfigNode.id) == col(ConfigNodeClosure.ancestor_id))
+            .group_by(col(ConfigNodeClosure.descendant_id))
         )
+        if ids is not None:
+            query = query.where(col(ConfigNodeClosure.descendant_id).in_(ids))
+        return query.cte("tree")
+
+    @staticmethod
+    def get_subtree_ids(root_id: UUID) -> SelectOfScalar[UUID]:
+        return select(ConfigNodeClosure.descendant_id).where(col(ConfigNodeClosure.ancestor_id) == root_id)
+
+    @staticmethod
+    def get_ancestor_ids(id: UUID) -> SelectOfScalar[UUID]:
+        return select(ConfigNodeClosure.ancestor_id).where(col(ConfigNodeClosure.descendant_id) == id)
+
+    @staticmethod
+    def get_descendant_ids_where(*filters: ColumnElement[bool]) -> SelectOfScalar[UUID]:
+        # Every node under (and including) the nodes matching all of the filters.
+        matched = select(ConfigNode.id).where(*filters)
+        return select(ConfigNodeClosure.descendant_id).where(col(ConfigNodeClosure.ancestor_id).in_(matched))
+
+    @staticmethod
+    def get_autoinstall_config() -> ColumnElement[Any]:
+        # The parsed JSONB value, instead of the serialized string of ConfigNode.autoinstall_config.
+        return type_coerce(col(ConfigNode.autoinstall_config), JSONB)
+
+    @classmethod
+    def get_entries(cls) -> Select[tuple[UUID, UUID | None, Any]]:
+        return select(col(ConfigNode.id), col(ConfigNode.parent_id), cls.get_autoinstall_config())
+
+    @classmethod
+    def get_config_contains_filter(cls, fragment: dict[str, Any]) -> ColumnElement[bool]:
+        return cls.get_autoinstall_config().contains(fragment)
+
+    @classmethod
+    def get_config_path_filter(cls, path: str) -> ColumnElement[bool]:
+        # True if the jsonpath returns any item, e.g. `$.apt."mirror-selection"` or `$.packages[*] ? (@ == "vim")`
+        # The JSONB comparator's path_exists is untyped.
+        path_exists: ColumnElement[bool] = cls.get_autoinstall_config().path_exists(cast(path, JSONPATH))
+        return path_exists
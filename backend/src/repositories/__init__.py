@@ -5,30 +5,42 @@ from typing import ClassVar, Generic, TypeAlias, TypedDict, TypeVar, Unpack
 from uuid import UUID
 
 from pydantic import BaseModel, ConfigDict
-from sqlalchemy.exc import MultipleResultsFound, NoResultFound
+from sqlalchemy.dialects.postgresql import JSONPATH
+from sqlalchemy.exc import DBAPIError, MultipleResultsFound, NoResultFound
 from sqlalchemy.sql.elements import UnaryExpression
-from sqlalchemy.sql.expression import ColumnElement, func, select, true
+from sqlalchemy.sql.expression import ColumnElement, and_, cast, delete, func, insert, literal, select, true, tuple_, update
+from sqlalchemy.sql.selectable import Select
 from sqlmodel.sql.expression import col, desc
 from src.consts.errors import ClientError, ServerError
 from src.dependencies import dbDI
 from src.models import DefaultModelMixin
 from src.schemas.enum_value import EnumValue
 from src.schemas.list_value import ListValue
+from src.schemas.page import ListValueQuery, PageCursor
 
 M = TypeVar("M", bound=DefaultModelMixin)
+S = TypeVar("S", bound=Select)
 
 QueryType: TypeAlias = ColumnElement[bool]
 OrderExpr: TypeAlias = ColumnElement | UnaryExpression
 OrderByType: TypeAlias = list[OrderExpr]
 
 DEFAULT_NOT_MODIFIABLE_FIELDS = {"id", "created_at", "updated_at"}
+SERVER_GENERATED_FIELDS = {"created_at", "updated_at"}
 
 
 class ListKwargsType(TypedDict, total=False):
     filter: QueryType
     order_by: OrderByType
-    offset: int
-    limit: int
+    offset: int | None
+    limit: int | None
+    cursor: PageCursor | None
+
+
+class ListValuesKwargsType(TypedDict, total=False):
+    filter: QueryType
+    cursor: PageCursor | None
+    limit: int | None
 
 
 class RepositoryImpl(BaseModel, Generic[M]):
@@ -39,7 +51,17 @@ class RepositoryImpl(BaseModel, Generic[M]):
 
     @property
     def order_by(self) -> OrderByType:
-        return [desc(self.model.updated_at)]
+        return [desc(self.model.updated_at), desc(self.model.id)]
+
+    def keyset_filter(self, cursor: PageCursor) -> QueryType:
+        # Rows after the cursor in the default order_by. Served by the (updated_at, id) index regardless of the page depth.
+        return tuple_(col(self.model.updated_at), col(self.model.id)) < tuple_(literal(cursor.updated_at), literal(cursor.id))
+
+    def paginate(self, query: S, **kwargs: Unpack[ListValuesKwargsType]) -> S:
+        filter: QueryType = kwargs.get("filter", true())
+        if cursor := kwargs.get("cursor"):
+            filter = and_(filter, self.keyset_filter(cursor))
+        return query.where(filter).order_by(*self.order_by).limit(kwargs.get("limit"))
 
     async def count(self, filter: QueryType | None = None) -> int:
         query = select(func.count()).select_from(self.model).where(filter or true())
@@ -65,35 +87,60 @@ class RepositoryImpl(BaseModel, Generic[M]):
         order_by: OrderByType = kwargs.get("order_by", self.order_by)
         offset: int | None = kwargs.get("offset", None)
         limit: int | None = kwargs.get("limit", None)
+        if cursor := kwargs.get("cursor", None):
+            filter = and_(filter, self.keyset_filter(cursor))
 
         query = select(self.model).where(filter).order_by(*order_by).offset(offset).limit(limit)
         return (await self.session.scalars(query)).all()
 
+    async def after_write(self, obj: M) -> None:
+        # Hook for subclasses, called after create/update has been flushed.
+        return None
+
+    # Writes are single INSERT/UPDATE/DELETE ... RETURNING statements, so that no row lock is held across a round trip.
     async def create(self, obj: M) -> M:
-        self.session.add(obj)
-        await self.session.flush()
-        await self.session.refresh(obj)
-        return obj
+        query = insert(self.model).values(**obj.model_dump(exclude=SERVER_GENERATED_FIELDS)).returning(self.model)
+        db_obj = (await self.session.scalars(query)).one()
+        await self.after_write(db_obj)
+        return db_obj
 
     async def update(self, obj: M) -> M:
         if not obj.id:
             ClientError.REQUEST_BODY_LACK.raise_()
 
-        db_obj = await self.retrieve_by_id(id=obj.id, with_for_update=True)
-        for key, value in obj.model_dump(exclude_unset=True, exclude=DEFAULT_NOT_MODIFIABLE_FIELDS).items():
-            setattr(db_obj, key, value)
+        if not (values := obj.model_dump(exclude_unset=True, exclude=DEFAULT_NOT_MODIFIABLE_FIELDS)):
+            return await self.retrieve_by_id(id=obj.id)
+
+        query = (
+            update(self.model).where(col(self.model.id) == obj.id).values(**values).returning(self.model).execution_options(populate_existing=True)
+        )
+        if (db_obj := (await self.session.scalars(query)).one_or_none()) is None:
+            ClientError.RESOURCE_NOT_FOUND.raise_()
 
-        await self.session.flush()
-        await self.session.refresh(db_obj)
+        await self.after_write(db_obj)
         return db_obj
 
     async def delete(self, obj: M) -> None:
         await self.session.delete(obj)
 
     async def delete_by_id(self, id: UUID) -> None:
-        await self.delete(obj=await self.retrieve_by_id(id=id, with_for_update=True))
+        query = delete(self.model).where(col(self.model.id) == id).returning(col(self.model.id))
+        if (await self.session.scalars(query)).one_or_none() is None:
+            ClientError.RESOURCE_NOT_FOUND.raise_()
+
+    def get_list_values_filter(self, query: ListValueQuery) -> QueryType:
+        raise NotImplementedError("subclasses must implement get_list_values_filter")
+
+    async def check_list_values_query(self, query: ListValueQuery) -> None:
+        # An invalid jsonpath fails the list query with a syntax error, so it is parsed on its own first, in a savepoint.
+        if query.config_path:
+            try:
+                async with self.session.begin_nested():
+                    await self.session.execute(select(cast(query.config_path, JSONPATH)))
+            except DBAPIError:
+                ClientError.REQUEST_BODY_INVALID.raise_(loc=["config_path"], input=query.config_path)
 
-    async def list_values(self) -> Sequence[ListValue]:
+    async def list_values(self, **kwargs: Unpack[ListValuesKwargsType]) -> Sequence[ListValue]:
         raise NotImplementedError("subclasses must implement list_values")
 
     async def list_enum_values(self) -> Sequence[EnumValue]:
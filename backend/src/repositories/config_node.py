@@ -1,31 +1,141 @@
-from collections.abc import Sequence
-from typing import Annotated
+from collections import defaultdict
+from collections.abc import Collection, Sequence
+from typing import Annotated, Any, Unpack
+from uuid import UUID
 
 from fastapi import Depends
+from sqlalchemy.orm import aliased
+from sqlalchemy.sql.expression import and_, delete, exists, insert, literal, or_, true
 from sqlmodel.sql.expression import col, select
-from src.models import ConfigNode
+from src.dependencies import configNodeTreeCacheDI, jobExecutorDI
+from src.models import ConfigNode, ConfigNodeClosure, Device
 from src.queries.config_node import ConfigNodeQuery
-from src.repositories import RepositoryImpl
+from src.repositories import ListValuesKwargsType, QueryType, RepositoryImpl
+from src.repositories.rendered_config import RenderedConfigRepository
+from src.resolvers.config_node import ConfigNodeEntry
 from src.schemas.enum_value import EnumValue
 from src.schemas.list_value import ListValue
+from src.schemas.page import ListValueQuery
 
 
 class ConfigNodeRepository(RepositoryImpl[ConfigNode]):
+    tree_cache: configNodeTreeCacheDI = None
+    executor: jobExecutorDI = None
+
     model = ConfigNode
 
-    async def list_values(self) -> Sequence[ListValue]:
-        tree = ConfigNodeQuery.get_nested_title_cte()
-        result = await self.session.exec(
-            select(self.model.id, tree.c.path, self.model.created_at, self.model.updated_at)
-            .select_from(self.model)
-            .join(tree, col(self.model.id) == col(tree.c.id))
-        )
-        return [ListValue.from_tuple(row) for row in result]
+    async def after_write(self, obj: ConfigNode) -> None:
+        await RenderedConfigRepository(session=self.session, executor=self.executor).refresh_by_config_node_id(config_node_id=obj.id)
+
+    async def is_ancestor_or_self(self, ancestor_id: UUID, id: UUID) -> bool:
+        if ancestor_id == id:
+            return True
+
+        closure = ConfigNodeClosure
+        query = select(exists().where(col(closure.ancestor_id) == ancestor_id, col(closure.descendant_id) == id))
+        return bool(await self.session.scalar(query))
+
+    async def retrieve_parent_id(self, id: UUID) -> UUID | None:
+        return (await self.session.exec(select(col(self.model.parent_id)).where(col(self.model.id) == id))).first()
+
+    async def insert_closure(self, id: UUID, parent_id: UUID | None) -> None:
+        closure = ConfigNodeClosure
+        await self.session.exec(insert(closure).values(ancestor_id=id, descendant_id=id, depth=0))
+        if parent_id:
+            ancestors = select(closure.ancestor_id, literal(id), col(closure.depth) + 1).where(col(closure.descendant_id) == parent_id)
+            await self.session.exec(insert(closure).from_select(["ancestor_id", "descendant_id", "depth"], ancestors))
+
+    async def move_closure(self, id: UUID, parent_id: UUID | None) -> None:
+        # Only the pairs between the moved subtree and its old/new ancestors are touched.
+        closure = ConfigNodeClosure
+        subtree = ConfigNodeQuery.get_subtree_ids(id)
+        await self.session.exec(delete(closure).where(col(closure.descendant_id).in_(subtree), col(closure.ancestor_id).not_in(subtree)))
+        if parent_id:
+            super_tree, sub_tree = aliased(closure, name="super_tree"), aliased(closure, name="sub_tree")
+            pairs = select(super_tree.ancestor_id, sub_tree.descendant_id, col(super_tree.depth) + col(sub_tree.depth) + 1).where(
+                col(super_tree.descendant_id) == parent_id, col(sub_tree.ancestor_id) == id
+            )
+            await self.session.exec(insert(closure).from_select(["ancestor_id", "descendant_id", "depth"], pairs))
+
+    async def list_entries(self) -> Sequence[ConfigNodeEntry]:
+        return [ConfigNodeEntry(*row) for row in await self.session.exec(ConfigNodeQuery.get_entries())]
+
+    async def list_entries_around(self, id: UUID, parent_id: UUID | None) -> Sequence[ConfigNodeEntry]:
+        # The subtree of the node, and the ancestors it has (or will have) under parent_id.
+        filter: QueryType = col(self.model.id).in_(ConfigNodeQuery.get_subtree_ids(id))
+        if parent_id:
+            filter = or_(filter, col(self.model.id).in_(ConfigNodeQuery.get_ancestor_ids(parent_id)))
+        return [ConfigNodeEntry(*row) for row in await self.session.exec(ConfigNodeQuery.get_entries().where(filter))]
+
+    async def list_ancestor_entries(self, id: UUID) -> Sequence[ConfigNodeEntry]:
+        query = ConfigNodeQuery.get_entries().where(col(self.model.id).in_(ConfigNodeQuery.get_ancestor_ids(id)))
+        return [ConfigNodeEntry(*row) for row in await self.session.exec(query)]
+
+    async def list_used_ids(self, root_id: UUID) -> set[UUID]:
+        # Nodes of the subtree which are used by any device, i.e. whose effective config gets rendered.
+        query = select(Device.config_node_id).distinct().where(col(Device.config_node_id).in_(ConfigNodeQuery.get_subtree_ids(root_id)))
+        return set((await self.session.exec(query)).all())
+
+    async def list_ids_by_config_containment(self, fragment: dict[str, Any]) -> Sequence[UUID]:
+        # ex) {"packages": ["vim"]} matches every node installing vim, regardless of the other packages.
+        return (await self.session.exec(select(self.model.id).where(ConfigNodeQuery.get_config_contains_filter(fragment)))).all()
+
+    async def list_ids_by_config_path(self, path: str) -> Sequence[UUID]:
+        return (await self.session.exec(select(self.model.id).where(ConfigNodeQuery.get_config_path_filter(path)))).all()
+
+    async def list_device_ids_by_config_node(self) -> dict[UUID, list[UUID]]:
+        device_ids: defaultdict[UUID, list[UUID]] = defaultdict(list)
+        for config_node_id, device_id in await self.session.exec(select(Device.config_node_id, Device.id)):
+            device_ids[config_node_id].append(device_id)
+        return device_ids
+
+    async def get_paths(self, ids: Collection[UUID] | None = None) -> dict[UUID, str]:
+        if self.tree_cache and self.tree_cache.ready:
+            cached = self.tree_cache.paths
+            if ids is None:
+                return dict(cached)
+            paths = {id: cached[id] for id in ids if id in cached}
+            # Nodes committed by another worker whose change notification has not reached the cache yet.
+            if missing := [id for id in ids if id not in cached]:
+                paths |= await self.query_paths(missing)
+            return paths
+        return await self.query_paths(ids)
+
+    async def query_paths(self, ids: Collection[UUID] | None = None) -> dict[UUID, str]:
+        if ids is not None and not ids:
+            return {}
+
+        tree = ConfigNodeQuery.get_nested_title_cte(ids)
+        return {id: path for id, path in await self.session.exec(select(tree.c.id, tree.c.path))}
+
+    def get_list_values_filter(self, query: ListValueQuery) -> QueryType:
+        filters: list[QueryType] = []
+        if query.name_prefix:
+            filters.append(col(self.model.name).startswith(query.name_prefix, autoescape=True))
+        if query.config_node_id:
+            filters.append(col(self.model.parent_id) == query.config_node_id)
+        if query.subtree_id:
+            filters.append(col(self.model.id).in_(ConfigNodeQuery.get_subtree_ids(query.subtree_id)))
+        if query.config_contains is not None:
+            filters.append(ConfigNodeQuery.get_config_contains_filter(query.config_contains))
+        if query.config_path:
+            filters.append(ConfigNodeQuery.get_config_path_filter(query.config_path))
+        return and_(true(), *filters)
+
+    async def list_values(self, **kwargs: Unpack[ListValuesKwargsType]) -> Sequence[ListValue]:
+        query = self.paginate(select(self.model.id, self.model.name, self.model.created_at, self.model.updated_at), **kwargs)
+        rows = (await self.session.exec(query)).all()
+        ids = [id for id, *_ in rows]
+        paths = await self.get_paths(ids if kwargs.get("limit") else None)
+        if missing := [id for id in ids if id not in paths]:
+            paths |= await self.query_paths(missing)
+        # One item per row, so that the next cursor is built from the last row of the page.
+        return [
+            ListValue(id=id, title=paths.get(id, name), created_at=created_at, updated_at=updated_at) for id, name, created_at, updated_at in rows
+        ]
 
     async def list_enum_values(self) -> Sequence[EnumValue]:
-        tree = ConfigNodeQuery.get_nested_title_cte()
-        result = await self.session.exec(select(tree.c.id, tree.c.path))
-        return [EnumValue.from_tuple(row) for row in result]
+        return [EnumValue(const=id, title=path) for id, path in (await self.get_paths()).items()]
 
 
 configNodeRepoDI = Annotated[ConfigNodeRepository, Depends(ConfigNodeRepository)]
@@ -1,41 +1,227 @@
-from collections.abc import Sequence
-from typing import Annotated
+from collections.abc import AsyncIterator, Sequence
+from itertools import batched
+from typing import Annotated, Any, Unpack
+from uuid import UUID, uuid4
 
 from fastapi import Depends
-from sqlalchemy.sql.expression import func
+from psycopg import AsyncConnection, sql
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.schema import Column, CreateTable, MetaData, Table
+from sqlalchemy.sql.expression import and_, exists, literal_column
+from sqlalchemy.sql.expression import select as sa_select
+from sqlalchemy.sql.expression import true, tuple_
+from sqlalchemy.types import Integer, String, Uuid
 from sqlmodel.sql.expression import col, select
+from src.dependencies import configNodeTreeCacheDI, jobExecutorDI
 from src.models import Device
 from src.queries.config_node import ConfigNodeQuery
-from src.repositories import RepositoryImpl
+from src.repositories import ListValuesKwargsType, QueryType, RepositoryImpl
+from src.repositories.config_node import ConfigNodeRepository
+from src.repositories.rendered_config import UPSERT_BATCH_SIZE, RenderedConfigRepository
+from src.resolvers.config_node import ConfigNodeResolver
+from src.schemas.device_export import DeviceExport
+from src.schemas.device_import import DeviceImportError, DeviceImportErrorMsg, DeviceImportResult, DeviceImportRow
 from src.schemas.enum_value import EnumValue
 from src.schemas.list_value import ListValue
+from src.schemas.page import ListValueQuery
+
+EXPORT_YIELD_PER = 1000
+
+StagedDevice = tuple[int, UUID, str, str, UUID]  # line, id, name, identifier, config_node_id
+
+# Dropped at the end of the importing transaction.
+device_import_staging = Table(
+    "device_import",
+    MetaData(),
+    Column("line", Integer, nullable=False),
+    Column("id", Uuid, nullable=False),
+    Column("name", String, nullable=False),
+    Column("identifier", String, nullable=False),
+    Column("config_node_id", Uuid, nullable=False),
+    prefixes=["TEMPORARY"],
+    postgresql_on_commit="DROP",
+)
 
 
 class DeviceRepository(RepositoryImpl[Device]):
+    tree_cache: configNodeTreeCacheDI = None
+    executor: jobExecutorDI = None
+
     model = Device
 
-    async def list_values(self) -> Sequence[ListValue]:
-        tree = ConfigNodeQuery.get_nested_title_cte()
-        result = await self.session.exec(
-            select(
-                self.model.id,
-                func.concat(self.model.name, " (using config-node='", tree.c.path, "')"),
-                self.model.created_at,
-                self.model.updated_at,
-            )
-            .select_from(self.model)
-            .join(tree, col(self.model.config_node_id) == col(tree.c.id))
+    async def after_write(self, obj: Device) -> None:
+        await RenderedConfigRepository(session=self.session, executor=self.executor).refresh_by_device(device=obj)
+
+    @staticmethod
+    def format_title(name: str, config_node_path: str) -> str:
+        return f"{name} (using config-node='{config_node_path}')"
+
+    def get_list_values_filter(self, query: ListValueQuery) -> QueryType:
+        filters: list[QueryType] = []
+        if query.name_prefix:
+            filters.append(col(self.model.name).startswith(query.name_prefix, autoescape=True))
+        if query.config_node_id:
+            filters.append(col(self.model.config_node_id) == query.config_node_id)
+        if query.subtree_id:
+            filters.append(col(self.model.config_node_id).in_(ConfigNodeQuery.get_subtree_ids(query.subtree_id)))
+
+        config_filters: list[QueryType] = []
+        if query.config_contains is not None:
+            config_filters.append(ConfigNodeQuery.get_config_contains_filter(query.config_contains))
+        if query.config_path:
+            config_filters.append(ConfigNodeQuery.get_config_path_filter(query.config_path))
+        if config_filters:
+            filters.append(col(self.model.config_node_id).in_(ConfigNodeQuery.get_descendant_ids_where(*config_filters)))
+        return and_(true(), *filters)
+
+    async def list_values(self, **kwargs: Unpack[ListValuesKwargsType]) -> Sequence[ListValue]:
+        # SQLAlchemy's select, as the typed overloads of SQLModel's stop at 4 columns.
+        query = self.paginate(
+            sa_select(
+                col(self.model.id), col(self.model.name), col(self.model.config_node_id), col(self.model.created_at), col(self.model.updated_at)
+            ),
+            **kwargs,
         )
-        return [ListValue.from_tuple(row) for row in result]
+        rows = (await self.session.execute(query)).all()
+
+        config_node_repository = ConfigNodeRepository(session=self.session, tree_cache=self.tree_cache)
+        node_ids = {node_id for _, _, node_id, *_ in rows}
+        paths = await config_node_repository.get_paths(node_ids if kwargs.get("limit") else None)
+        if missing := [node_id for node_id in node_ids if node_id not in paths]:
+            paths |= await config_node_repository.query_paths(missing)
+        # One item per row, so that the next cursor is built from the last row of the page.
+        return [
+            ListValue(id=id, title=self.format_title(name, paths.get(node_id, str(node_id))), created_at=created_at, updated_at=updated_at)
+            for id, name, node_id, created_at, updated_at in rows
+        ]
 
     async def list_enum_values(self) -> Sequence[EnumValue]:
-        tree = ConfigNodeQuery.get_nested_title_cte()
-        result = await self.session.exec(
-            select(self.model.id, func.concat(self.model.name, " (using config-node='", tree.c.path, "')"))
-            .select_from(self.model)
-            .join(tree, col(self.model.config_node_id) == col(tree.c.id))
+        rows = (await self.session.exec(select(self.model.id, self.model.name, self.model.config_node_id))).all()
+        paths = await ConfigNodeRepository(session=self.session, tree_cache=self.tree_cache).get_paths()
+        return [EnumValue(const=id, title=self.format_title(name, paths[node_id])) for id, name, node_id in rows if node_id in paths]
+
+    async def stream_export(self) -> AsyncIterator[DeviceExport]:
+        # Devices are fetched through a server-side cursor, so memory only grows with the number of ConfigNodes.
+        config_node_repository = ConfigNodeRepository(session=self.session, tree_cache=self.tree_cache)
+        paths = await config_node_repository.get_paths()
+        resolver = ConfigNodeResolver(await config_node_repository.list_entries())
+
+        resolved: dict[UUID, tuple[dict[str, Any] | None, str | None]] = {}
+        query = select(self.model.id, self.model.name, self.model.identifier, self.model.config_node_id).order_by(*self.order_by)
+        async for id, name, identifier, node_id in await self.session.stream(query.execution_options(yield_per=EXPORT_YIELD_PER)):
+            if node_id not in resolved:
+                try:
+                    resolved[node_id] = (resolver.to_autoinstall(resolver.resolve(node_id)).export(mode="json"), None)
+                except (KeyError, ValueError) as err:
+                    resolved[node_id] = (None, str(err))
+
+            autoinstall_config, error = resolved[node_id]
+            yield DeviceExport(
+                id=id,
+                name=name,
+                identifier=identifier,
+                config_node_id=node_id,
+                config_node_path=paths.get(node_id),
+                autoinstall_config=autoinstall_config,
+                error=error,
+            )
+
+    @staticmethod
+    def check_import_rows(
+        rows: Sequence[DeviceImportRow],
+        paths: dict[UUID, str],
+        resolver: ConfigNodeResolver,
+    ) -> tuple[list[StagedDevice], list[DeviceImportError]]:
+        node_ids = {path: id for id, path in paths.items()}
+        node_errors: dict[UUID, str | None] = {}
+        lines_by_name: dict[str, int] = {}
+        lines_by_serial: dict[str, int] = {}
+
+        staged: list[StagedDevice] = []
+        errors: list[DeviceImportError] = []
+        for row in rows:
+            if (node_id := node_ids.get(row.config_node_path)) is None:
+                msg = DeviceImportErrorMsg.CONFIG_NODE_NOT_FOUND.format(row.config_node_path)
+                errors.append(DeviceImportError(line=row.line, name=row.name, msg=msg))
+                continue
+
+            # The rendered config of every imported device must be valid, so each ConfigNode is validated once up front.
+            if node_id not in node_errors:
+                try:
+                    resolver.to_autoinstall(resolver.resolve(node_id))
+                    node_errors[node_id] = None
+                except (KeyError, ValueError) as err:
+                    node_errors[node_id] = DeviceImportErrorMsg.CONFIG_NODE_INVALID.format(row.config_node_path, err)
+            if node_error := node_errors[node_id]:
+                errors.append(DeviceImportError(line=row.line, name=row.name, msg=node_error))
+                continue
+
+            if (line := lines_by_name.get(row.name)) is not None:
+                errors.append(DeviceImportError(line=row.line, name=row.name, msg=DeviceImportErrorMsg.DUPLICATED_NAME.format(line)))
+                continue
+            if (line := lines_by_serial.get(row.serial)) is not None:
+                errors.append(DeviceImportError(line=row.line, name=row.name, msg=DeviceImportErrorMsg.DUPLICATED_SERIAL.format(line)))
+                continue
+
+            lines_by_name[row.name] = lines_by_serial[row.serial] = row.line
+            staged.append((row.line, uuid4(), row.name, row.serial, node_id))
+
+        return staged, errors
+
+    async def copy_to_staging(self, staged: Sequence[StagedDevice]) -> None:
+        await self.session.execute(CreateTable(device_import_staging))
+
+        connection = await (await self.session.connection()).get_raw_connection()
+        driver_connection: AsyncConnection = connection.driver_connection  # type: ignore[assignment]
+        copy_query = sql.SQL("COPY {} ({}) FROM STDIN").format(
+            sql.Identifier(device_import_staging.name),
+            sql.SQL(", ").join(sql.Identifier(column.name) for column in device_import_staging.columns),
+        )
+        async with driver_connection.cursor() as cursor, cursor.copy(copy_query) as copy:
+            for row in staged:
+                await copy.write_row(row)
+
+    async def bulk_import(self, rows: Sequence[DeviceImportRow]) -> DeviceImportResult:
+        # Devices are matched by their identifier (serial): new ones are inserted, and existing ones are moved/renamed.
+        config_node_repository = ConfigNodeRepository(session=self.session, tree_cache=self.tree_cache)
+        resolver = ConfigNodeResolver(await config_node_repository.list_entries())
+        staged, errors = self.check_import_rows(rows, await config_node_repository.get_paths(), resolver)
+        if not staged:
+            return DeviceImportResult(errors=errors)
+
+        await self.copy_to_staging(staged)
+        staging = device_import_staging.c
+
+        name_taken = exists().where(col(self.model.name) == staging.name, col(self.model.identifier) != staging.identifier)
+        conflicts = await self.session.exec(select(staging.line, staging.name).where(name_taken))
+        conflict_errors = [DeviceImportError(line=line, name=name, msg=DeviceImportErrorMsg.NAME_ALREADY_USED) for line, name in conflicts]
+
+        stmt = insert(self.model).from_select(
+            ["id", "name", "identifier", "config_node_id"],
+            select(staging.id, staging.name, staging.identifier, staging.config_node_id).where(~name_taken),
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[self.model.identifier],
+            set_={"name": stmt.excluded.name, "config_node_id": stmt.excluded.config_node_id},
+            where=tuple_(col(self.model.name), col(self.model.config_node_id)).is_distinct_from(
+                tuple_(stmt.excluded.name, stmt.excluded.config_node_id)
+            ),
+        )
+        # xmax is only set on the rows that were updated by ON CONFLICT.
+        changed = (await self.session.exec(stmt.returning(col(self.model.id), literal_column("xmax = 0")))).all()
+
+        rendered_config_repository = RenderedConfigRepository(session=self.session, executor=self.executor)
+        for batch in batched((id for id, _ in changed), UPSERT_BATCH_SIZE):
+            devices = (await self.session.exec(select(self.model).where(col(self.model.id).in_(batch)))).all()
+            await rendered_config_repository.upsert(devices, resolver)
+
+        created = sum(1 for _, is_created in changed if is_created)
+        return DeviceImportResult(
+            created=created,
+            updated=len(changed) - created,
+            unchanged=len(staged) - len(conflict_errors) - len(changed),
+            errors=sorted([*errors, *conflict_errors], key=lambda error: error.line),
         )
-        return [EnumValue.from_tuple(row) for row in result]
 
 
 deviceRepoDI = Annotated[DeviceRepository, Depends(DeviceRepository)]
@@ -0,0 +1,142 @@
+from datetime import timedelta
+from typing import Annotated, Any
+from uuid import UUID
+
+from fastapi import Depends
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.sql.expression import and_, or_, select, text, update
+from sqlalchemy.sql.functions import func
+from sqlmodel.sql.expression import col
+from src.consts.errors import ClientError, ServerError
+from src.models import JOB_DEDUPE_INDEX_PREDICATE, Job
+from src.repositories import SERVER_GENERATED_FIELDS, RepositoryImpl
+from src.schemas.job import ACTIVE_JOB_STATUSES, JobStatus, JobType
+
+ENQUEUE_ATTEMPTS = 3
+
+
+class JobRepository(RepositoryImpl[Job]):
+    model = Job
+
+    async def enqueue(self, obj: Job) -> Job:
+        # Returns the active job with the same (type, dedupe_key) instead of queueing a duplicate.
+        for _ in range(ENQUEUE_ATTEMPTS):
+            query = (
+                insert(Job)
+                .values(**obj.model_dump(exclude=SERVER_GENERATED_FIELDS))
+                .on_conflict_do_nothing(index_elements=["type", "dedupe_key"], index_where=text(JOB_DEDUPE_INDEX_PREDICATE))
+                .returning(Job)
+            )
+            if db_obj := (await self.session.scalars(query)).one_or_none():
+                return db_obj
+
+            active_filter = and_(col(Job.type) == obj.type, col(Job.dedupe_key) == obj.dedupe_key, col(Job.status).in_(ACTIVE_JOB_STATUSES))
+            if db_obj := (await self.session.scalars(select(Job).where(active_filter))).one_or_none():
+                return db_obj
+            # The conflicting job finished in between, so queue this one again.
+        ServerError.UNKNOWN_SERVER_ERROR.raise_()
+
+    async def claim(self, type: JobType, worker_id: str, lease_timeout: float, max_attempts: int) -> Job | None:
+        # The oldest pending job, or a running one whose worker stopped renewing its lease.
+        # SKIP LOCKED lets concurrent workers claim different jobs instead of waiting on the same row.
+        claimable = or_(
+            col(Job.status) == JobStatus.PENDING,
+            and_(col(Job.status) == JobStatus.RUNNING, col(Job.lease_expires_at) < func.now(), col(Job.attempts) < max_attempts),
+        )
+        candidate = (
+            select(col(Job.id))
+            .where(col(Job.type) == type, claimable)
+            .order_by(col(Job.created_at))
+            .limit(1)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        query = (
+            update(Job)
+            .where(col(Job.id) == candidate)
+            .values(
+                status=JobStatus.RUNNING,
+                worker_id=worker_id,
+                attempts=col(Job.attempts) + 1,
+                lease_expires_at=func.now() + timedelta(seconds=lease_timeout),
+                started_at=func.coalesce(col(Job.started_at), func.now()),
+                error=None,
+            )
+            .returning(Job)
+            .execution_options(populate_existing=True)
+        )
+        return (await self.session.scalars(query)).one_or_none()
+
+    async def heartbeat(self, id: UUID, worker_id: str, lease_timeout: float, progress: float | None = None) -> bool:
+        # False when the job is no longer this worker's, i.e. it was cancelled or its lease expired and another worker claimed it.
+        values: dict[str, Any] = {"lease_expires_at": func.now() + timedelta(seconds=lease_timeout)}
+        if progress is not None:
+            values["progress"] = progress
+        query = (
+            update(Job)
+            .where(col(Job.id) == id, col(Job.worker_id) == worker_id, col(Job.status) == JobStatus.RUNNING)
+            .values(**values)
+            .returning(col(Job.id))
+        )
+        return (await self.session.scalars(query)).one_or_none() is not None
+
+    async def finish(
+        self,
+        id: UUID,
+        worker_id: str,
+        status: JobStatus,
+        result: dict[str, Any] | None = None,
+        error: str | None = None,
+    ) -> bool:
+        values: dict[str, Any] = {"status": status, "result": result, "error": error, "finished_at": func.now(), "lease_expires_at": None}
+        if status == JobStatus.SUCCEEDED:
+            values["progress"] = 1.0
+        query = (
+            update(Job)
+            .where(col(Job.id) == id, col(Job.worker_id) == worker_id, col(Job.status) == JobStatus.RUNNING)
+            .values(**values)
+            .returning(col(Job.id))
+        )
+        return (await self.session.scalars(query)).one_or_none() is not None
+
+    async def release(self, id: UUID, worker_id: str) -> None:
+        # Hands a job interrupted by a graceful shutdown back to the queue, without counting it as an attempt.
+        query = (
+            update(Job)
+            .where(col(Job.id) == id, col(Job.worker_id) == worker_id, col(Job.status) == JobStatus.RUNNING)
+            .values(status=JobStatus.PENDING, worker_id=None, lease_expires_at=None, attempts=col(Job.attempts) - 1)
+        )
+        await self.session.execute(query)
+
+    async def fail_abandoned(self, max_attempts: int) -> int:
+        # Jobs whose lease expired on every attempt, e.g. because they crash the worker, are not retried anymore.
+        query = (
+            update(Job)
+            .where(col(Job.status) == JobStatus.RUNNING, col(Job.lease_expires_at) < func.now(), col(Job.attempts) >= max_attempts)
+            .values(
+                status=JobStatus.FAILED,
+                error=f"The worker stopped responding on all {max_attempts} attempts.",
+                finished_at=func.now(),
+                lease_expires_at=None,
+            )
+            .returning(col(Job.id))
+        )
+        return len((await self.session.scalars(query)).all())
+
+    async def cancel(self, id: UUID) -> Job:
+        # A running job is stopped by its worker on the next heartbeat.
+        query = (
+            update(Job)
+            .where(col(Job.id) == id, col(Job.status).in_(ACTIVE_JOB_STATUSES))
+            .values(status=JobStatus.CANCELLED, finished_at=func.now(), lease_expires_at=None)
+            .returning(Job)
+            .execution_options(populate_existing=True)
+        )
+        if db_obj := (await self.session.scalars(query)).one_or_none():
+            return db_obj
+
+        await self.retrieve_by_id(id=id)
+        ClientError.JOB_ALREADY_FINISHED.raise_()
+
+
+jobRepoDI = Annotated[JobRepository, Depends(JobRepository)]
@@ -0,0 +1,88 @@
+from asyncio import gather
+from collections.abc import Sequence
+from hashlib import sha256
+from itertools import batched, chain
+from typing import Annotated, Any
+from uuid import UUID, uuid4
+
+from fastapi import Depends
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel.sql.expression import col, or_, select
+from src.dependencies import jobExecutorDI
+from src.executors.jobs import render_user_data_batch
+from src.executors.process_pool import run_job
+from src.models import ConfigNode, Device, RenderedConfig
+from src.queries.config_node import ConfigNodeQuery
+from src.repositories import RepositoryImpl
+from src.resolvers.config_node import ConfigNodeEntry, ConfigNodeResolver
+from src.utils.cloudinitlib import render_meta_data
+
+UPSERT_BATCH_SIZE = 1000
+RENDER_JOB_BATCH_SIZE = 50  # ConfigNodes rendered per job
+
+
+def build_row(device: Device, user_data: bytes) -> dict[str, Any]:
+    meta_data = render_meta_data(instance_id=str(device.id), local_hostname=device.name)
+    return {
+        "id": uuid4(),
+        "device_id": device.id,
+        "identifier": device.identifier,
+        "user_data": user_data,
+        "meta_data": meta_data,
+        "content_hash": sha256(user_data + b"\0" + meta_data).hexdigest(),
+    }
+
+
+class RenderedConfigRepository(RepositoryImpl[RenderedConfig]):
+    executor: jobExecutorDI = None
+
+    model = RenderedConfig
+
+    async def retrieve_by_identifier(self, identifier: str) -> RenderedConfig:
+        return await self.retrieve_by_query(col(self.model.identifier) == identifier)
+
+    async def render_user_data(self, node_ids: Sequence[UUID], resolver: ConfigNodeResolver) -> dict[UUID, bytes]:
+        # Devices sharing a ConfigNode share its user-data, so each node is validated and rendered once, in the job executor.
+        configs = [resolver.resolve(node_id) for node_id in node_ids]
+        results = await gather(*(run_job(self.executor, render_user_data_batch, list(batch)) for batch in batched(configs, RENDER_JOB_BATCH_SIZE)))
+        return dict(zip(node_ids, chain.from_iterable(results), strict=True))
+
+    async def upsert(self, devices: Sequence[Device], resolver: ConfigNodeResolver) -> None:
+        user_data = await self.render_user_data(list({device.config_node_id for device in devices}), resolver)
+
+        # Batched to stay below PostgreSQL's bind parameter limit.
+        for batch in batched(devices, UPSERT_BATCH_SIZE):
+            stmt = insert(self.model).values([build_row(device, user_data[device.config_node_id]) for device in batch])
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[col(self.model.device_id)],
+                set_={key: stmt.excluded[key] for key in ("identifier", "user_data", "meta_data", "content_hash")},
+            )
+            await self.session.exec(stmt)
+
+    async def refresh_by_config_node_id(self, config_node_id: UUID) -> None:
+        # Only devices under the changed node are affected, and they only need the node's ancestors and subtree.
+        subtree = ConfigNodeQuery.get_subtree_ids(config_node_id)
+        ancestors = ConfigNodeQuery.get_ancestor_ids(config_node_id)
+
+        devices = (await self.session.exec(select(Device).where(col(Device.config_node_id).in_(subtree)))).all()
+        if not devices:
+            return
+
+        entries = await self.session.exec(
+            ConfigNodeQuery.get_entries().where(or_(col(ConfigNode.id).in_(subtree), col(ConfigNode.id).in_(ancestors)))
+        )
+        await self.upsert(devices, ConfigNodeResolver(ConfigNodeEntry(*row) for row in entries))
+
+    async def refresh_by_device(self, device: Device) -> None:
+        ancestors = ConfigNodeQuery.get_ancestor_ids(device.config_node_id)
+        entries = await self.session.exec(ConfigNodeQuery.get_entries().where(col(ConfigNode.id).in_(ancestors)))
+        await self.upsert([device], ConfigNodeResolver(ConfigNodeEntry(*row) for row in entries))
+
+    async def refresh_all(self) -> int:
+        devices = (await self.session.exec(select(Device))).all()
+        entries = await self.session.exec(ConfigNodeQuery.get_entries())
+        await self.upsert(devices, ConfigNodeResolver(ConfigNodeEntry(*row) for row in entries))
+        return len(devices)
+
+
+renderedConfigRepoDI = Annotated[RenderedConfigRepository, Depends(RenderedConfigRepository)]
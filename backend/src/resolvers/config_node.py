@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from collections.abc import Iterable
+from typing import Any, NamedTuple
+from uuid import UUID
+
+from src.schemas.autoinstall import Autoinstall
+from src.utils.mergelib import deep_merge
+from src.validators.autoinstall import validate_autoinstall
+
+
+class ConfigNodeEntry(NamedTuple):
+    id: UUID
+    parent_id: UUID | None
+    autoinstall_config: dict[str, Any]  # Parsed JSONB value
+
+
+class ConfigNodeResolver:
+    """
+    Resolves the effective autoinstall config of ConfigNodes by merging each node on top of its ancestors.
+    All nodes needed for resolution must be given up front, and merged prefixes are memoized,
+    so resolving many nodes of the same tree merges every shared ancestor only once.
+    """
+
+    def __init__(self, entries: Iterable[ConfigNodeEntry]) -> None:
+        self.entries: dict[UUID, ConfigNodeEntry] = {entry.id: entry for entry in entries}
+        self.children: defaultdict[UUID | None, list[UUID]] = defaultdict(list)
+        for entry in self.entries.values():
+            self.children[entry.parent_id if entry.parent_id in self.entries else None].append(entry.id)
+
+        self._resolved: dict[UUID, dict[str, Any]] = {}
+
+    def resolve(self, id: UUID) -> dict[str, Any]:
+        if id not in self.entries:
+            raise KeyError(id)
+
+        # Walk up until the root or an already resolved ancestor, then merge back down.
+        chain: list[UUID] = []
+        next_id: UUID | None = id
+        while next_id in self.entries and next_id not in self._resolved:
+            if next_id in chain:
+                raise ValueError(f"ConfigNode {next_id} has a circular parent reference.")
+            chain.append(next_id)
+            next_id = self.entries[next_id].parent_id
+
+        merged: dict[str, Any] = self._resolved.get(next_id, {}) if next_id else {}
+        for node_id in reversed(chain):
+            merged = self._resolved[node_id] = deep_merge(merged, self.entries[node_id].autoinstall_config)
+        return self._resolved[id]
+
+    def resolve_subtree(self, id: UUID, leaves_only: bool = True) -> dict[UUID, dict[str, Any]]:
+        result: dict[UUID, dict[str, Any]] = {}
+        stack: list[tuple[UUID, dict[str, Any]]] = [(id, self.resolve(id))]
+        visited: set[UUID] = set()
+        while stack:
+            node_id, merged = stack.pop()
+            if node_id in visited:
+                continue
+            visited.add(node_id)
+
+            if not (children := self.children.get(node_id)) or not leaves_only:
+                result[node_id] = merged
+
+            for child_id in children or ():
+                child_merged = self._resolved.get(child_id)
+                if child_merged is None:
+                    child_merged = self._resolved[child_id] = deep_merge(merged, self.entries[child_id].autoinstall_config)
+                stack.append((child_id, child_merged))
+        return result
+
+    @staticmethod
+    def to_autoinstall(config: dict[str, Any]) -> Autoinstall:
+        return validate_autoinstall(config)
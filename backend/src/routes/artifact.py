@@ -0,0 +1,96 @@
+from asyncio import to_thread
+from collections.abc import Callable, Iterator
+from functools import partial
+from pathlib import Path as FilePath
+from typing import Annotated
+
+from fastapi import APIRouter, Path, Request
+from fastapi.responses import FileResponse, Response, StreamingResponse
+from src.consts.errors import ClientError
+from src.consts.tags import OpenAPITag
+from src.dependencies import chunkStoreDI, configDI, isoBuilderDI
+from src.schemas.chunk_store import ChunkStoreIndex, MirroredArtifact
+from src.utils.checksumlib import cached_file_sha256
+from src.utils.httplib import etag_matches, if_range_matches, parse_range
+
+artifact_router = APIRouter(prefix="/artifacts", tags=[OpenAPITag.ARTIFACT])
+
+ISO_MEDIA_TYPE = "application/x-iso9660-image"
+
+BuildKey = Annotated[str, Path(pattern=r"^[0-9a-f]{64}$")]
+ArtifactName = Annotated[str, Path(pattern=r"^[\w.-]+$")]
+
+
+class ArtifactFileResponse(FileResponse):
+    # Sent with the server's http.response.pathsend (sendfile) extension when available.
+    # Otherwise read in worker threads, in larger chunks than the default 64 KiB to cut the per-chunk overhead on multi-GB files.
+    chunk_size = 1024 * 1024
+
+
+@artifact_router.api_route("/base/{name}", methods=["GET", "HEAD"], response_class=FileResponse)
+async def download_base_iso(name: str, request: Request, config: configDI) -> Response:
+    path = config.iso.input_dir / name
+    if FilePath(name).name != name or path.suffix != ".iso" or not path.is_file():
+        ClientError.RESOURCE_NOT_FOUND.raise_()
+
+    # Strong validator from the cached SHA-256. FileResponse handles Range and If-Range against it.
+    etag = f'"{await to_thread(cached_file_sha256, path)}"'
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    return ArtifactFileResponse(path, media_type=ISO_MEDIA_TYPE, filename=name, headers={"ETag": etag, "Cache-Control": "no-cache"})
+
+
+def ranged_response(request: Request, etag: str, size: int, filename: str, iter_range: Callable[[int, int], Iterator[bytes]]) -> Response:
+    # Range, If-Range and conditional GET over an artifact assembled on the fly, etag being a strong validator of its bytes.
+    headers = {
+        "ETag": etag,
+        "Accept-Ranges": "bytes",
+        "Cache-Control": "no-cache",
+        "Content-Disposition": f'attachment; filename="{filename}"',
+    }
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"ETag": etag})
+
+    byte_range = None
+    if if_range_matches(request.headers.get("if-range"), etag):
+        try:
+            byte_range = parse_range(request.headers.get("range"), size)
+        except ValueError:
+            return Response(status_code=416, headers=headers | {"Content-Range": f"bytes */{size}"})
+
+    start, end = byte_range or (0, size)
+    headers["Content-Length"] = str(end - start)
+    if byte_range:
+        headers["Content-Range"] = f"bytes {start}-{end - 1}/{size}"
+
+    status_code = 206 if byte_range else 200
+    if request.method == "HEAD":
+        return Response(status_code=status_code, headers=headers, media_type=ISO_MEDIA_TYPE)
+    # The iterator is synchronous, so every chunk is read in the threadpool.
+    return StreamingResponse(iter_range(start, end), status_code=status_code, headers=headers, media_type=ISO_MEDIA_TYPE)
+
+
+@artifact_router.api_route("/builds/{key}", methods=["GET", "HEAD"], response_class=StreamingResponse)
+async def download_built_iso(key: BuildKey, request: Request, iso_builder: isoBuilderDI) -> Response:
+    # Assembled on the fly from the base ISO and the build's patches, see IsoBuilder.
+    # The build key is content-addressed, so it is a strong validator of the assembled bytes.
+    if not (manifest := await iso_builder.get_artifact(key)):
+        ClientError.RESOURCE_NOT_FOUND.raise_()
+    return ranged_response(request, f'"{key}"', manifest.size, f"{key}.iso", partial(iso_builder.iter_artifact, manifest))
+
+
+@artifact_router.get("/mirror/")
+async def list_mirrored_isos(chunk_store: chunkStoreDI) -> ChunkStoreIndex:
+    manifests = await to_thread(chunk_store.list_manifests)
+    return ChunkStoreIndex(
+        artifacts=[MirroredArtifact(name=manifest.name, size=manifest.size, sha256=manifest.sha256) for manifest in manifests],
+        usage=await to_thread(chunk_store.usage),
+    )
+
+
+@artifact_router.api_route("/mirror/{name}", methods=["GET", "HEAD"], response_class=StreamingResponse)
+async def download_mirrored_iso(name: ArtifactName, request: Request, chunk_store: chunkStoreDI) -> Response:
+    # Reassembled on the fly from the chunks shared with the other mirrored ISOs, see ChunkStore.
+    if not (manifest := await to_thread(chunk_store.get_manifest, name)):
+        ClientError.RESOURCE_NOT_FOUND.raise_()
+    return ranged_response(request, f'"{manifest.sha256}"', manifest.size, name, partial(chunk_store.iter_range, manifest))
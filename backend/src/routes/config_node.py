@@ -1,19 +1,35 @@
-from collections.abc import Sequence
+from collections.abc import AsyncIterator, Sequence
+from typing import Annotated
 from uuid import UUID
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Query, Response
+from fastapi.responses import StreamingResponse
 from src.consts.tags import OpenAPITag
-from src.models import ConfigNode
+from src.dependencies import configDI, configNodeTreeCacheDI, jobExecutorDI
+from src.models import ConfigNode, Job
+from src.repositories.config_node import ConfigNodeRepository
+from src.schemas.autoinstall import Autoinstall
+from src.schemas.device_export import NDJSON_MEDIA_TYPE
 from src.schemas.enum_value import EnumValue
+from src.schemas.job import ConfigLintJobPayload, JobType
 from src.schemas.list_value import ListValue
-from src.services.config_node import configNodeServiceDI
+from src.schemas.page import NEXT_CURSOR_HEADER, ListValueQuery, PageCursor
+from src.services.config_node import ConfigNodeService, configNodeServiceDI
+from src.services.job import jobServiceDI
 
 config_node_router = APIRouter(prefix="/confignode", tags=[OpenAPITag.CONFIG_NODE])
 
 
 @config_node_router.get("/", response_model=Sequence[ListValue])
-async def list_config_nodes(config_node_svc: configNodeServiceDI) -> Sequence[ListValue]:
-    return await config_node_svc.list_values()
+async def list_config_nodes(
+    query: Annotated[ListValueQuery, Query()],
+    response: Response,
+    config_node_svc: configNodeServiceDI,
+) -> Sequence[ListValue]:
+    result = await config_node_svc.list_values(query=query)
+    if next_cursor := PageCursor.next_of(result, query.limit):
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor.encode()
+    return result
 
 
 @config_node_router.get("/enum-values", response_model=Sequence[EnumValue])
@@ -21,11 +37,45 @@ async def list_config_node_enum_values(config_node_svc: configNodeServiceDI) ->
     return await config_node_svc.list_enum_values()
 
 
+@config_node_router.get("/lint", response_class=StreamingResponse)
+async def lint_config_nodes(config: configDI, tree_cache: configNodeTreeCacheDI, executor: jobExecutorDI) -> StreamingResponse:
+    # Streams a ConfigLintResult NDJSON line per invalid ConfigNode. The request-scoped session is closed before the body is streamed.
+    async def generate() -> AsyncIterator[bytes]:
+        async with config.sqlalchemy.async_read_only_session_maker() as session:
+            repository = ConfigNodeRepository(session=session, tree_cache=tree_cache, executor=executor)
+            async for result in ConfigNodeService(repository=repository).lint():
+                yield result.to_ndjson()
+
+    return StreamingResponse(generate(), media_type=NDJSON_MEDIA_TYPE)
+
+
+@config_node_router.post("/lint", response_model=Job)
+async def queue_config_node_lint(job_svc: jobServiceDI) -> Job:
+    # Same as GET /lint, as a CONFIG_LINT job whose result keeps the first invalid ConfigNodes.
+    return await job_svc.submit(JobType.CONFIG_LINT, ConfigLintJobPayload(), dedupe_key="all")
+
+
 @config_node_router.get("/{config_node_id}", response_model=ConfigNode)
 async def retrieve_config_node(config_node_id: UUID, config_node_svc: configNodeServiceDI) -> ConfigNode:
     return await config_node_svc.retrieve_by_id(id=config_node_id)
 
 
+# Serialized like Autoinstall.export, so only the keys set by the ConfigNodes (and their extra keys) are returned.
+@config_node_router.get("/{config_node_id}/resolved", response_model=Autoinstall, response_model_exclude_unset=True, response_model_exclude_none=True)
+async def resolve_config_node(config_node_id: UUID, config_node_svc: configNodeServiceDI) -> Autoinstall:
+    return await config_node_svc.resolve(id=config_node_id)
+
+
+@config_node_router.get(
+    "/{config_node_id}/resolved-leaves",
+    response_model=dict[UUID, Autoinstall],
+    response_model_exclude_unset=True,
+    response_model_exclude_none=True,
+)
+async def resolve_config_node_leaves(config_node_id: UUID, config_node_svc: configNodeServiceDI) -> dict[UUID, Autoinstall]:
+    return await config_node_svc.resolve_subtree(id=config_node_id)
+
+
 @config_node_router.post("/", response_model=ConfigNode)
 async def create_config_node(config_node: ConfigNode, config_node_svc: configNodeServiceDI) -> ConfigNode:
     return await config_node_svc.create(obj=config_node)
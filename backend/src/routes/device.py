@@ -1,19 +1,32 @@
-from collections.abc import Sequence
+from collections.abc import AsyncIterator, Sequence
+from typing import Annotated
 from uuid import UUID
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from src.consts.errors import ClientError
 from src.consts.tags import OpenAPITag
-from src.models import Device
+from src.dependencies import configDI, configNodeTreeCacheDI
+from src.models import Device, Job
+from src.repositories.device import DeviceRepository
+from src.schemas.device_export import NDJSON_MEDIA_TYPE
+from src.schemas.device_import import DeviceImportFormat
 from src.schemas.enum_value import EnumValue
+from src.schemas.job import DeviceImportJobPayload, JobType
 from src.schemas.list_value import ListValue
-from src.services.device import deviceServiceDI
+from src.schemas.page import NEXT_CURSOR_HEADER, ListValueQuery, PageCursor
+from src.services.device import DeviceService, deviceServiceDI
+from src.services.job import jobServiceDI
 
 device_router = APIRouter(prefix="/device", tags=[OpenAPITag.DEVICE])
 
 
 @device_router.get("/", response_model=Sequence[ListValue])
-async def list_devices(device_svc: deviceServiceDI) -> Sequence[ListValue]:
-    return await device_svc.list_values()
+async def list_devices(query: Annotated[ListValueQuery, Query()], response: Response, device_svc: deviceServiceDI) -> Sequence[ListValue]:
+    result = await device_svc.list_values(query=query)
+    if next_cursor := PageCursor.next_of(result, query.limit):
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor.encode()
+    return result
 
 
 @device_router.get("/enum-values", response_model=Sequence[EnumValue])
@@ -21,6 +34,31 @@ async def list_device_enum_values(device_svc: deviceServiceDI) -> Sequence[EnumV
     return await device_svc.list_enum_values()
 
 
+@device_router.get("/export", response_class=StreamingResponse)
+async def export_devices(config: configDI, tree_cache: configNodeTreeCacheDI) -> StreamingResponse:
+    # The request-scoped session is closed before the body is streamed, so the export owns its session.
+    async def generate() -> AsyncIterator[bytes]:
+        async with config.sqlalchemy.async_read_only_session_maker() as session:
+            device_svc = DeviceService(repository=DeviceRepository(session=session, tree_cache=tree_cache))
+            async for line in device_svc.export_ndjson():
+                yield line
+
+    return StreamingResponse(generate(), media_type=NDJSON_MEDIA_TYPE)
+
+
+@device_router.post("/import", response_model=Job)
+async def import_devices(request: Request, job_svc: jobServiceDI, format: DeviceImportFormat = "csv") -> Job:
+    # The body is the raw CSV (name,serial,config_node_path header) or NDJSON document.
+    # Imported by a DEVICE_IMPORT job, whose result is a DeviceImportResult.
+    if not (content := await request.body()):
+        ClientError.REQUEST_BODY_EMPTY.raise_()
+    try:
+        text = content.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        ClientError.REQUEST_BODY_INVALID.raise_()
+    return await job_svc.submit(JobType.DEVICE_IMPORT, DeviceImportJobPayload(format=format, content=text))
+
+
 @device_router.get("/{device_id}", response_model=Device)
 async def retrieve_device(device_id: UUID, device_svc: deviceServiceDI) -> Device:
     return await device_svc.retrieve_by_id(id=device_id)
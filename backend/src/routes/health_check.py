@@ -4,9 +4,11 @@ from typing import Literal
 from fastapi import APIRouter, status
 from fastapi.responses import JSONResponse
 from pydantic import BaseModel
+from sqlalchemy.ext.asyncio.engine import AsyncEngine
 from sqlalchemy.sql import text
 from src.consts.tags import OpenAPITag
 from src.dependencies import configDI, dbDI
+from src.utils.third_parties.sqlalchemylib import InstrumentedAsyncAdaptedQueuePool, PoolStats
 
 logger = getLogger(__name__)
 
@@ -50,3 +52,16 @@ async def readyz(config: configDI, db: dbDI) -> JSONResponse:
         content.database = False
 
     return JSONResponse(status_code=content.status_code, content=content.model_dump())
+
+
+class PoolStatsResponse(BaseModel):
+    primary: PoolStats | None = None
+    replica: PoolStats | None = None
+
+
+@health_check_router.get("/pool", response_model=PoolStatsResponse)
+async def pool_stats(config: configDI) -> PoolStatsResponse:
+    def get_stats(engine: AsyncEngine | None) -> PoolStats | None:
+        return engine.pool.stats() if engine and isinstance(engine.pool, InstrumentedAsyncAdaptedQueuePool) else None
+
+    return PoolStatsResponse(primary=get_stats(config.sqlalchemy.async_engine), replica=get_stats(config.sqlalchemy.async_replica_engine))
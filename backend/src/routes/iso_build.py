@@ -0,0 +1,26 @@
+from fastapi import APIRouter
+from src.consts.tags import OpenAPITag
+from src.dependencies import isoBuilderDI
+from src.models import Job
+from src.schemas.iso_build import IsoBuildRequest, IsoBuildResult
+from src.schemas.job import IsoDownloadJobPayload, JobType
+from src.services.job import jobServiceDI
+
+iso_build_router = APIRouter(prefix="/iso-build", tags=[OpenAPITag.ISO_BUILD])
+
+
+@iso_build_router.post("/", response_model=IsoBuildResult)
+async def build_iso(request: IsoBuildRequest, iso_builder: isoBuilderDI, job_svc: jobServiceDI) -> IsoBuildResult:
+    # The base ISO is never hashed here: without an indexed digest, the build key is only known once the queued job has hashed it.
+    source = await iso_builder.read_source(request)
+    if (prepared := await iso_builder.peek(source)) and await iso_builder.get_artifact(prepared.key):
+        return IsoBuildResult(key=prepared.key, built=True)
+    job = await job_svc.submit(JobType.ISO_BUILD, request, dedupe_key=iso_builder.source_key(source))
+    return IsoBuildResult(key=prepared.key if prepared else None, job_id=job.id)
+
+
+@iso_build_router.post("/download", response_model=Job)
+async def download_base_iso(payload: IsoDownloadJobPayload, job_svc: jobServiceDI) -> Job:
+    # Downloads the latest Ubuntu live server ISO into the input directory.
+    # One download at a time whatever the payload, as the latest LTS and the latest release can be the same file and would share its .part file.
+    return await job_svc.submit(JobType.ISO_DOWNLOAD, payload, dedupe_key="latest")
@@ -0,0 +1,36 @@
+from collections.abc import Sequence
+from typing import Annotated
+from uuid import UUID
+
+from fastapi import APIRouter, Query, Response
+from sqlalchemy.sql.expression import and_, true
+from sqlmodel.sql.expression import col
+from src.consts.tags import OpenAPITag
+from src.models import Job
+from src.schemas.job import JobListQuery
+from src.schemas.page import NEXT_CURSOR_HEADER, PageCursor
+from src.services.job import jobServiceDI
+
+job_router = APIRouter(prefix="/job", tags=[OpenAPITag.JOB])
+
+
+@job_router.get("/", response_model=Sequence[Job])
+async def list_jobs(query: Annotated[JobListQuery, Query()], response: Response, job_svc: jobServiceDI) -> Sequence[Job]:
+    filter = and_(
+        col(Job.type) == query.type if query.type else true(),
+        col(Job.status) == query.status if query.status else true(),
+    )
+    result = await job_svc.list(filter=filter, cursor=query.page_cursor, limit=query.limit)
+    if next_cursor := PageCursor.next_of(result, query.limit):
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor.encode()
+    return result
+
+
+@job_router.get("/{job_id}", response_model=Job)
+async def retrieve_job(job_id: UUID, job_svc: jobServiceDI) -> Job:
+    return await job_svc.retrieve_by_id(id=job_id)
+
+
+@job_router.post("/{job_id}/cancel", response_model=Job)
+async def cancel_job(job_id: UUID, job_svc: jobServiceDI) -> Job:
+    return await job_svc.cancel(id=job_id)
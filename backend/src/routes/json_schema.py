@@ -1,16 +1,33 @@
-from fastapi import APIRouter
+from typing import Annotated
+
+from fastapi import APIRouter, Header, Response, status
+from src.consts.errors import ClientError
 from src.consts.tags import OpenAPITag
-from src.models import ConfigNode, Device
-from src.utils.third_parties.sqlmodellib import SchemaInfo, get_json_schema
+from src.dependencies import jsonSchemaCacheDI
+from src.utils.httplib import etag_matches
 
 json_schema_router = APIRouter(prefix="/json-schemas", tags=[OpenAPITag.JSON_SCHEMA])
 
 
-@json_schema_router.get("/confignode", response_model=None)
-async def get_config_node_json_schema() -> SchemaInfo:
-    return get_json_schema(ConfigNode)
-
+@json_schema_router.get(
+    "/{name}",
+    response_class=Response,
+    responses={
+        status.HTTP_200_OK: {"content": {"application/json": {}}},
+        status.HTTP_304_NOT_MODIFIED: {"description": "Not Modified"},
+    },
+)
+async def get_json_schema(
+    name: str,
+    json_schema_cache: jsonSchemaCacheDI,
+    if_none_match: Annotated[str | None, Header()] = None,
+) -> Response:
+    # name is the lowercased model name, e.g. confignode, device
+    if not (schema := json_schema_cache.get(name)):
+        ClientError.RESOURCE_NOT_FOUND.raise_()
 
-@json_schema_router.get("/device", response_model=None)
-async def get_device_json_schema() -> SchemaInfo:
-    return get_json_schema(Device)
+    # Browsers always revalidate, so a new deploy is picked up immediately and an unchanged schema costs a 304.
+    headers = {"ETag": schema.etag, "Cache-Control": "no-cache"}
+    if etag_matches(if_none_match, schema.etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=schema.content, media_type="application/json", headers=headers)
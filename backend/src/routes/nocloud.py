@@ -0,0 +1,24 @@
+from fastapi import APIRouter
+from fastapi.responses import Response
+from src.consts.tags import OpenAPITag
+from src.services.nocloud import noCloudServiceDI
+
+# cloud-init NoCloud datasource, booted with `ds=nocloud-net;s=<NOCLOUD_URL>__dmi.system-serial-number__/`
+nocloud_router = APIRouter(prefix="/nocloud", tags=[OpenAPITag.NO_CLOUD])
+
+NOCLOUD_MEDIA_TYPE = "text/plain; charset=utf-8"
+
+
+@nocloud_router.get("/{serial}/user-data", response_class=Response)
+async def get_user_data(serial: str, nocloud_svc: noCloudServiceDI) -> Response:
+    return Response(content=await nocloud_svc.get_user_data(serial=serial), media_type=NOCLOUD_MEDIA_TYPE)
+
+
+@nocloud_router.get("/{serial}/meta-data", response_class=Response)
+async def get_meta_data(serial: str, nocloud_svc: noCloudServiceDI) -> Response:
+    return Response(content=await nocloud_svc.get_meta_data(serial=serial), media_type=NOCLOUD_MEDIA_TYPE)
+
+
+@nocloud_router.get("/{serial}/vendor-data", response_class=Response)
+async def get_vendor_data(serial: str, nocloud_svc: noCloudServiceDI) -> Response:
+    return Response(content=await nocloud_svc.get_vendor_data(serial=serial), media_type=NOCLOUD_MEDIA_TYPE)
@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+from datetime import datetime
+from itertools import accumulate
+
+from pydantic import BaseModel
+
+
+class ChunkManifest(BaseModel):
+    name: str
+    size: int
+    sha256: str
+    chunks: list[tuple[str, int]]  # SHA-256 and size of each chunk, in order
+    created_at: datetime
+
+    def offsets(self) -> list[int]:
+        return [0, *accumulate(size for _, size in self.chunks)]
+
+
+class ChunkStoreUsage(BaseModel):
+    artifacts: int
+    logical_size: int  # Total size of the stored artifacts
+    physical_size: int  # Size of the unique chunks on disk
+    chunks: int
+
+
+class MirroredArtifact(BaseModel):
+    name: str
+    size: int
+    sha256: str
+
+
+class ChunkStoreIndex(BaseModel):
+    artifacts: list[MirroredArtifact]
+    usage: ChunkStoreUsage
@@ -0,0 +1,22 @@
+from __future__ import annotations
+
+from uuid import UUID
+
+from pydantic import BaseModel
+
+
+class ConfigLintError(BaseModel):
+    type: str
+    msg: str
+    loc: list[str]
+
+
+class ConfigLintResult(BaseModel):
+    # Emitted only for ConfigNodes used by devices whose effective (ancestor-merged) config does not validate against the Autoinstall schema.
+    config_node_id: UUID
+    config_node_path: str | None = None
+    device_ids: list[UUID]  # Devices rendered from this node, whose configs can no longer be rendered
+    errors: list[ConfigLintError]
+
+    def to_ndjson(self) -> bytes:
+        return self.model_dump_json().encode() + b"\n"
@@ -0,0 +1,23 @@
+from __future__ import annotations
+
+from typing import Any
+from uuid import UUID
+
+from pydantic import BaseModel
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+class DeviceExport(BaseModel):
+    id: UUID
+    name: str
+    identifier: str
+    config_node_id: UUID
+    config_node_path: str | None = None
+
+    # Effective (ancestor-merged) autoinstall config, or the reason why it could not be resolved.
+    autoinstall_config: dict[str, Any] | None = None
+    error: str | None = None
+
+    def to_ndjson(self) -> bytes:
+        return self.model_dump_json().encode() + b"\n"
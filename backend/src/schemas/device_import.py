@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+from collections.abc import Iterator
+from csv import DictReader
+from enum import StrEnum
+from io import StringIO
+from json import JSONDecodeError, loads
+from typing import Annotated, Literal
+
+from pydantic import BaseModel, Field, ValidationError
+
+DeviceImportFormat = Literal["csv", "ndjson"]
+
+
+class DeviceImportErrorMsg(StrEnum):
+    NOT_JSON_OBJECT = "JSON 객체 형식이 아니에요."
+    CONFIG_NODE_NOT_FOUND = "설정 노드 경로 '{}'를 찾을 수 없어요."
+    CONFIG_NODE_INVALID = "설정 노드 '{}'의 autoinstall 설정이 올바르지 않아요: {}"
+    DUPLICATED_NAME = "{}번째 줄과 이름이 중복되어 있어요."
+    DUPLICATED_SERIAL = "{}번째 줄과 시리얼 번호가 중복되어 있어요."
+    NAME_ALREADY_USED = "다른 시리얼 번호의 장치가 이미 이 이름을 사용하고 있어요."
+
+
+class DeviceImportRow(BaseModel):
+    line: int
+    name: Annotated[str, Field(min_length=1)]
+    serial: Annotated[str, Field(min_length=1)]  # Stored as Device.identifier, the DMI system serial number used by the NoCloud datasource
+    config_node_path: Annotated[str, Field(min_length=1)]  # Breadcrumb path of the ConfigNode, e.g. "site-a > rack-1"
+
+
+class DeviceImportError(BaseModel):
+    line: int
+    msg: str
+    name: str | None = None
+
+
+class DeviceImportResult(BaseModel):
+    created: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    errors: list[DeviceImportError] = []
+
+
+def parse_device_import(content: bytes, format: DeviceImportFormat) -> Iterator[DeviceImportRow | DeviceImportError]:
+    text = content.decode("utf-8-sig")
+    records: Iterator[tuple[int, object]]
+    if format == "csv":
+        # Line 1 is the header, and values of the columns without a header are dropped.
+        records = (
+            (line, {key: value for key, value in record.items() if key is not None})
+            for line, record in enumerate(DictReader(StringIO(text)), start=2)
+        )
+    else:
+        records = ((line, raw) for line, raw in enumerate(text.splitlines(), start=1) if raw.strip())
+
+    for line, record in records:
+        try:
+            data = loads(record) if isinstance(record, str) else record
+            if not isinstance(data, dict):
+                raise ValueError(DeviceImportErrorMsg.NOT_JSON_OBJECT)
+            yield DeviceImportRow.model_validate(data | {"line": line})
+        except ValidationError as err:
+            yield DeviceImportError(line=line, msg="; ".join(f"{'.'.join(map(str, e['loc']))}: {e['msg']}" for e in err.errors()))
+        except (JSONDecodeError, ValueError) as err:
+            yield DeviceImportError(line=line, msg=str(err))
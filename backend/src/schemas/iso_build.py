@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Annotated
+from uuid import UUID
+
+from pydantic import BaseModel, ConfigDict, Field
+
+# Booted as `ds=nocloud-net;s=<nocloud_url>__dmi.system-serial-number__/`, so it must end with a slash and cannot contain whitespace or ';'.
+NoCloudURL = Annotated[str, Field(pattern=r"^https?://[^\s;]+/$")]
+
+
+class IsoBuildRequest(BaseModel):
+    base_iso_name: str | None = None  # File name under the input directory, defaults to the configured base ISO
+    nocloud_url: NoCloudURL | None = None  # Defaults to the configured NOCLOUD_URL
+
+
+class IsoBuildResult(BaseModel):
+    # The build key addresses the output by its content: the base ISO digest, NOCLOUD_URL and the patched boot files.
+    # None until the queued job has hashed a base ISO whose digest is not indexed yet, the job's result then has the key.
+    key: str | None = None
+    built: bool = False  # Already cached, and downloadable from /artifacts/builds/<key>
+    job_id: UUID | None = None  # ISO_BUILD job queued on a cache miss, poll /job/<job_id> until it finishes
+
+
+class IsoBuildPatch(BaseModel):
+    offset: int
+    data: bytes
+
+    model_config = ConfigDict(ser_json_bytes="base64", val_json_bytes="base64")
+
+
+class IsoBuildManifest(BaseModel):
+    key: str
+    base_iso_name: str
+    base_iso_sha256: str
+    nocloud_url: str
+    volume_id: str
+    files: dict[str, str]  # Path in the ISO to the SHA-256 of the patched file
+    # The built ISO is the base ISO with these patches applied, see src.utils.isolib.IsoOverlay
+    size: int
+    patches: list[IsoBuildPatch]
+    built_at: datetime
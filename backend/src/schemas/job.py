@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+from enum import StrEnum
+
+from pydantic import BaseModel
+from src.schemas.device_import import DeviceImportFormat
+from src.schemas.page import PageQuery
+
+
+class JobType(StrEnum):
+    ISO_DOWNLOAD = "iso_download"
+    ISO_BUILD = "iso_build"
+    DEVICE_IMPORT = "device_import"
+    CONFIG_LINT = "config_lint"
+
+
+class JobStatus(StrEnum):
+    PENDING = "pending"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+
+ACTIVE_JOB_STATUSES = (JobStatus.PENDING, JobStatus.RUNNING)
+
+
+class IsoDownloadJobPayload(BaseModel):
+    lts: bool = True
+    mirror: bool = False  # Also add the ISO to the chunk store mirror once downloaded
+
+
+class DeviceImportJobPayload(BaseModel):
+    format: DeviceImportFormat
+    content: str  # Raw CSV or NDJSON document, see src.schemas.device_import
+
+
+class ConfigLintJobPayload(BaseModel):
+    pass
+
+
+class JobListQuery(PageQuery):
+    type: JobType | None = None
+    status: JobStatus | None = None
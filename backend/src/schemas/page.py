@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections.abc import Sequence
+from datetime import datetime
+from typing import Annotated, Any, Protocol
+from uuid import UUID
+
+from pydantic import BaseModel, Field, Json, field_validator
+from src.schemas.list_value import ListValue
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class PageItem(Protocol):
+    @property
+    def id(self) -> UUID: ...
+
+    @property
+    def updated_at(self) -> datetime | None: ...
+
+
+class PageCursor(BaseModel):
+    # Position in the default (updated_at DESC, id DESC) order of RepositoryImpl.
+    updated_at: datetime
+    id: UUID
+
+    def encode(self) -> str:
+        return urlsafe_b64encode(self.model_dump_json().encode()).decode()
+
+    @classmethod
+    def decode(cls, value: str) -> PageCursor:
+        return cls.model_validate_json(urlsafe_b64decode(value.encode()))
+
+    @classmethod
+    def next_of(cls, items: Sequence[ListValue] | Sequence[PageItem], limit: int | None) -> PageCursor | None:
+        if not (limit and len(items) >= limit and (last := items[-1]).updated_at):
+            return None
+        return cls(updated_at=last.updated_at, id=last.id)
+
+
+class PageQuery(BaseModel):
+    cursor: str | None = None
+    limit: Annotated[int | None, Field(ge=1, le=1000)] = None
+
+    @field_validator("cursor")
+    @classmethod
+    def validate_cursor(cls, v: str | None) -> str | None:
+        if v is not None:
+            try:
+                PageCursor.decode(v)
+            except Exception as err:
+                raise ValueError("Invalid cursor") from err
+        return v
+
+    @property
+    def page_cursor(self) -> PageCursor | None:
+        return PageCursor.decode(self.cursor) if self.cursor else None
+
+
+class ListValueQuery(PageQuery):
+    name_prefix: str | None = None
+    config_node_id: UUID | None = None
+    subtree_id: UUID | None = None  # ConfigNode id, matches everything under it including itself
+
+    # Matched against the autoinstall_config of ConfigNodes, or of any ConfigNode in the ancestor chain of Devices.
+    config_contains: Json[dict[str, Any]] | None = None  # ex) {"packages": ["vim"]}
+    config_path: str | None = None  # jsonpath, ex) $.apt."mirror-selection"
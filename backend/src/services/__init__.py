@@ -7,6 +7,7 @@ from src.models import DefaultModelMixin
 from src.repositories import ListKwargsType, QueryType, RepositoryImpl
 from src.schemas.enum_value import EnumValue
 from src.schemas.list_value import ListValue
+from src.schemas.page import ListValueQuery
 
 M = TypeVar("M", bound=DefaultModelMixin)
 
@@ -38,8 +39,13 @@ class ServiceImpl(BaseModel, Generic[M]):
     async def delete_by_id(self, id: UUID) -> None:
         await self.repository.delete_by_id(id=id)
 
-    async def list_values(self) -> Sequence[ListValue]:
-        return await self.repository.list_values()
+    async def list_values(self, query: ListValueQuery) -> Sequence[ListValue]:
+        await self.repository.check_list_values_query(query)
+        return await self.repository.list_values(
+            filter=self.repository.get_list_values_filter(query),
+            cursor=query.page_cursor,
+            limit=query.limit,
+        )
 
     async def list_enum_values(self) -> Sequence[EnumValue]:
         return await self.repository.list_enum_values()
@@ -1,11 +1,24 @@
+from asyncio import FIRST_COMPLETED, Task, create_task, wait
+from collections.abc import AsyncIterator, Callable
+from itertools import batched
+from json import JSONDecodeError, loads
 from typing import Annotated, NoReturn
 from uuid import UUID
 
 from fastapi import Depends
+from pydantic import ValidationError
 from src.consts.errors import ClientError
+from src.executors.jobs import lint_autoinstall_configs, validate_autoinstall_configs
+from src.executors.process_pool import run_job
 from src.models import ConfigNode
 from src.repositories.config_node import configNodeRepoDI
+from src.resolvers.config_node import ConfigNodeEntry, ConfigNodeResolver
+from src.schemas.autoinstall import Autoinstall
+from src.schemas.config_lint import ConfigLintError, ConfigLintResult
 from src.services import ServiceImpl
+from src.validators.autoinstall import raise_autoinstall_errors
+
+LINT_JOB_BATCH_SIZE = 200  # ConfigNodes validated per job
 
 
 class ConfigNodeService(ServiceImpl[ConfigNode]):
@@ -18,24 +31,113 @@ class ConfigNodeService(ServiceImpl[ConfigNode]):
         if not node.parent_id:
             return
 
-        nodes: dict[UUID, ConfigNode] = {n.id: n for n in await self.repository.list()}
-        parent = nodes.get(node.parent_id)
-        while parent:
-            if parent.id == node.id:
-                _raise_validation_error("부모 설정이 순환 참조를 발생시킵니다.")
+        if await self.repository.is_ancestor_or_self(ancestor_id=node.id, id=node.parent_id):
+            _raise_validation_error("부모 설정이 순환 참조를 발생시킵니다.")
+
+    @staticmethod
+    def _check_autoinstall_config(node: ConfigNode) -> None:
+        # Stored as JSONB, and merged with the ancestors' configs as an object.
+        try:
+            is_object = isinstance(loads(node.autoinstall_config), dict)
+        except JSONDecodeError:
+            is_object = False
+
+        if not is_object:
+            msg = "autoinstall 설정은 JSON 객체여야 합니다."
+            ClientError.REQUEST_BODY_INVALID(type="value_error", msg=msg, loc=["autoinstall_config"], input=node.autoinstall_config).raise_()
 
-            if not parent.parent_id:
-                break
+    async def _check_effective_configs(self, node: ConfigNode) -> None:
+        # Every node of the subtree which is rendered for a device must still resolve to a valid Autoinstall after the write.
+        if not (used_ids := await self.repository.list_used_ids(root_id=node.id)):
+            return
 
-            parent = nodes.get(parent.parent_id)
+        parent_id = node.parent_id if "parent_id" in node.model_fields_set else await self.repository.retrieve_parent_id(id=node.id)
+        entries = {entry.id: entry for entry in await self.repository.list_entries_around(id=node.id, parent_id=parent_id)}
+        entries[node.id] = ConfigNodeEntry(id=node.id, parent_id=parent_id, autoinstall_config=loads(node.autoinstall_config))
+        resolver = ConfigNodeResolver(entries.values())
+        try:
+            # Roots included, as resolving applies the "+" and "$delete" markers of the document itself.
+            await run_job(self.repository.executor, validate_autoinstall_configs, [resolver.resolve(node_id) for node_id in used_ids])
+        except ValidationError as err:
+            raise_autoinstall_errors(err, loc=["autoinstall_config"])
 
     async def create(self, obj: ConfigNode) -> ConfigNode:
+        self._check_autoinstall_config(obj)
         await self._check_cycle(obj)
-        return await super().create(obj)
+        created = await super().create(obj)
+        await self.repository.insert_closure(id=created.id, parent_id=created.parent_id)
+        return created
 
     async def update(self, obj: ConfigNode) -> ConfigNode:
+        self._check_autoinstall_config(obj)
         await self._check_cycle(obj)
+        await self._check_effective_configs(obj)
+        # The closure must be moved before the update, as rendered configs are refreshed with it after the write.
+        if "parent_id" in obj.model_fields_set and obj.parent_id != await self.repository.retrieve_parent_id(id=obj.id):
+            await self.repository.move_closure(id=obj.id, parent_id=obj.parent_id)
         return await super().update(obj)
 
+    async def get_resolver(self) -> ConfigNodeResolver:
+        return ConfigNodeResolver(await self.repository.list_entries())
+
+    async def resolve(self, id: UUID) -> Autoinstall:
+        resolver = await self.get_resolver()
+        try:
+            return resolver.to_autoinstall(resolver.resolve(id))
+        except KeyError:
+            ClientError.RESOURCE_NOT_FOUND.raise_()
+
+    async def resolve_subtree(self, id: UUID) -> dict[UUID, Autoinstall]:
+        resolver = await self.get_resolver()
+        try:
+            return {node_id: resolver.to_autoinstall(config) for node_id, config in resolver.resolve_subtree(id).items()}
+        except KeyError:
+            ClientError.RESOURCE_NOT_FOUND.raise_()
+
+    async def lint(self, on_progress: Callable[[int, int], None] | None = None) -> AsyncIterator[ConfigLintResult]:
+        # Revalidates the effective config of every ConfigNode used by a device, e.g. after the Autoinstall schema is regenerated.
+        # Same rule as the write path: an unused node, such as a partial root shared by other nodes, is never rendered on its own.
+        # Batches are validated in parallel by the job executor, and failures are yielded as soon as their batch completes.
+        resolver = await self.get_resolver()
+        paths = await self.repository.get_paths()
+        device_ids = await self.repository.list_device_ids_by_config_node()
+        used_ids = [node_id for node_id in resolver.entries if node_id in device_ids]
+
+        async def lint_batch(node_ids: tuple[UUID, ...]) -> list[ConfigLintResult]:
+            results = await run_job(self.repository.executor, lint_autoinstall_configs, [resolver.resolve(node_id) for node_id in node_ids])
+            return [
+                ConfigLintResult(
+                    config_node_id=node_id,
+                    config_node_path=paths.get(node_id),
+                    device_ids=device_ids[node_id],
+                    errors=[ConfigLintError(type=error["type"], msg=error["msg"], loc=list(map(str, error["loc"]))) for error in errors],
+                )
+                for node_id, errors in zip(node_ids, results, strict=True)
+                if errors
+            ]
+
+        # Only a bounded number of batches are resolved and in flight at once, so memory does not grow with the fleet size.
+        max_in_flight = self.repository.executor.max_pending if self.repository.executor else 1
+        batches = batched(used_ids, LINT_JOB_BATCH_SIZE)
+        pending: set[Task[list[ConfigLintResult]]] = set()
+        checked = 0
+        try:
+            while True:
+                while len(pending) < max_in_flight and (batch := next(batches, None)):
+                    pending.add(create_task(lint_batch(batch)))
+                if not pending:
+                    break
+
+                done, pending = await wait(pending, return_when=FIRST_COMPLETED)
+                for task in done:
+                    checked += LINT_JOB_BATCH_SIZE
+                    for result in task.result():
+                        yield result
+                if on_progress:
+                    on_progress(min(checked, len(used_ids)), len(used_ids))
+        finally:
+            for task in pending:
+                task.cancel()
+
 
 configNodeServiceDI = Annotated[ConfigNodeService, Depends(ConfigNodeService)]
@@ -1,13 +1,57 @@
+from collections.abc import AsyncIterator
 from typing import Annotated
 
 from fastapi import Depends
+from pydantic import ValidationError
+from src.executors.jobs import validate_autoinstall_configs
+from src.executors.process_pool import run_job
 from src.models import Device
+from src.repositories.config_node import ConfigNodeRepository
 from src.repositories.device import deviceRepoDI
+from src.resolvers.config_node import ConfigNodeResolver
+from src.schemas.device_import import DeviceImportError, DeviceImportFormat, DeviceImportResult, DeviceImportRow, parse_device_import
 from src.services import ServiceImpl
+from src.validators.autoinstall import raise_autoinstall_errors
 
 
 class DeviceService(ServiceImpl[Device]):
     repository: deviceRepoDI
 
+    async def _check_effective_config(self, device: Device) -> None:
+        # The device's config is rendered right after the write, so its ConfigNode must resolve to a valid Autoinstall.
+        if "config_node_id" not in device.model_fields_set:
+            return
+
+        config_node_repository = ConfigNodeRepository(session=self.repository.session, tree_cache=self.repository.tree_cache)
+        resolver = ConfigNodeResolver(await config_node_repository.list_ancestor_entries(id=device.config_node_id))
+        try:
+            await run_job(self.repository.executor, validate_autoinstall_configs, [resolver.resolve(device.config_node_id)])
+        except KeyError:
+            return  # Reported by the foreign key constraint
+        except ValidationError as err:
+            raise_autoinstall_errors(err, loc=["config_node_id"])
+
+    async def create(self, obj: Device) -> Device:
+        await self._check_effective_config(obj)
+        return await super().create(obj)
+
+    async def update(self, obj: Device) -> Device:
+        await self._check_effective_config(obj)
+        return await super().update(obj)
+
+    async def export_ndjson(self) -> AsyncIterator[bytes]:
+        async for row in self.repository.stream_export():
+            yield row.to_ndjson()
+
+    async def bulk_import(self, content: bytes, format: DeviceImportFormat) -> DeviceImportResult:
+        rows: list[DeviceImportRow] = []
+        errors: list[DeviceImportError] = []
+        for row in parse_device_import(content, format):
+            (rows if isinstance(row, DeviceImportRow) else errors).append(row)  # type: ignore[arg-type]
+
+        result = await self.repository.bulk_import(rows)
+        result.errors = sorted([*errors, *result.errors], key=lambda error: error.line)
+        return result
+
 
 deviceServiceDI = Annotated[DeviceService, Depends(DeviceService)]
@@ -0,0 +1,23 @@
+from typing import Annotated
+from uuid import UUID, uuid4
+
+from fastapi import Depends
+from pydantic import BaseModel
+from src.models import Job
+from src.repositories.job import jobRepoDI
+from src.schemas.job import JobType
+from src.services import ServiceImpl
+
+
+class JobService(ServiceImpl[Job]):
+    repository: jobRepoDI
+
+    async def submit(self, type: JobType, payload: BaseModel, dedupe_key: str | None = None) -> Job:
+        # Picked up by a BackgroundJobRunner within its poll interval, once the request's transaction is committed.
+        return await self.repository.enqueue(Job(id=uuid4(), type=type, payload=payload.model_dump(mode="json"), dedupe_key=dedupe_key))
+
+    async def cancel(self, id: UUID) -> Job:
+        return await self.repository.cancel(id=id)
+
+
+jobServiceDI = Annotated[JobService, Depends(JobService)]
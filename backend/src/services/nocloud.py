@@ -0,0 +1,24 @@
+from typing import Annotated
+
+from fastapi import Depends
+from pydantic import BaseModel
+from src.repositories.rendered_config import renderedConfigRepoDI
+from src.utils.cloudinitlib import render_vendor_data
+
+
+class NoCloudService(BaseModel):
+    # Documents are rendered on write (see RenderedConfigRepository), so serving them is a single indexed fetch.
+    repository: renderedConfigRepoDI
+
+    async def get_user_data(self, serial: str) -> bytes:
+        return (await self.repository.retrieve_by_identifier(identifier=serial)).user_data
+
+    async def get_meta_data(self, serial: str) -> bytes:
+        return (await self.repository.retrieve_by_identifier(identifier=serial)).meta_data
+
+    async def get_vendor_data(self, serial: str) -> bytes:
+        await self.repository.retrieve_by_identifier(identifier=serial)
+        return render_vendor_data()
+
+
+noCloudServiceDI = Annotated[NoCloudService, Depends(NoCloudService)]
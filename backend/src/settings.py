@@ -1,8 +1,10 @@
 from __future__ import annotations
 
 from functools import cached_property
+from importlib.util import find_spec
+from os import cpu_count
 from pathlib import Path
-from typing import ClassVar, cast
+from typing import Any, ClassVar, cast
 
 from fastapi.openapi.models import Contact, License
 from packaging.version import InvalidVersion, Version
@@ -15,6 +17,8 @@ from sqlalchemy.ext.asyncio.session import async_sessionmaker
 from sqlalchemy.orm.session import sessionmaker
 from sqlmodel.ext.asyncio.session import AsyncSession as SQLModelAsyncSession
 from sqlmodel.orm.session import Session as SQLModelSession
+from src.schemas.job import JobType
+from src.utils.third_parties.sqlalchemylib import InstrumentedAsyncAdaptedQueuePool
 from toml import load as toml_load
 from uvicorn.config import Config
 
@@ -24,6 +28,28 @@ class ServerSetting(BaseSettings):
     port: int = 8000
     debug: bool = False
 
+    # Production serving, ignored in debug mode which always runs a single reloading process.
+    # Every worker has its own connection pool, so the database must accept workers * (pool_size + max_overflow) connections.
+    workers: int = 1  # 0 to run one worker per CPU core
+    backlog: int = 2048
+    timeout_keep_alive: int = 5
+    limit_concurrency: int | None = None
+
+    @property
+    def worker_count(self) -> int:
+        if self.debug:
+            return 1
+        return self.workers or cpu_count() or 1
+
+    @property
+    def loop(self) -> str:
+        # uvloop and httptools are optional, uvicorn's pure Python fallbacks are used when they are not installed.
+        return "uvloop" if not self.debug and find_spec("uvloop") else "auto"
+
+    @property
+    def http(self) -> str:
+        return "httptools" if not self.debug and find_spec("httptools") else "auto"
+
 
 class SQLAlchemySetting(BaseSettings):
     driver: str
@@ -35,14 +61,35 @@ class SQLAlchemySetting(BaseSettings):
 
     echo: bool = False
     echo_pool: bool = False
-    pool_pre_ping: bool = True
+    pool_pre_ping: bool = False  # Stale connections are detected by the background liveness check instead
+    pool_size: int = 5
+    max_overflow: int = 10
+    pool_timeout: float = 30.0
+    pool_recycle: int = 1800
+    pool_prewarm: int = 0  # Connections opened on startup, up to pool_size
+    pool_liveness_interval: float = 10.0  # Seconds between background liveness checks, 0 to disable
+    query_cache_size: int = 500  # SQLAlchemy compiled statement cache
+    prepare_threshold: int | None = 5  # psycopg prepares a statement after this many executions, None to disable
     autoflush: bool = True
     expire_on_commit: bool = False
     connect_timeout: float = 15.0
 
+    # Optional streaming replica for read-only sessions, sharing the credentials and database name of the primary.
+    replica_host: str | None = None
+    replica_port: int | None = None
+
     model_config = SettingsConfigDict(validate_default=True)
 
-    ENGINE_CONFIG_FIELDS: ClassVar[set[str]] = {"echo", "echo_pool", "pool_pre_ping"}
+    ENGINE_CONFIG_FIELDS: ClassVar[set[str]] = {
+        "echo",
+        "echo_pool",
+        "pool_pre_ping",
+        "pool_size",
+        "max_overflow",
+        "pool_timeout",
+        "pool_recycle",
+        "query_cache_size",
+    }
     SESSION_MAKER_CONFIG_FIELDS: ClassVar[set[str]] = {"autoflush", "expire_on_commit"}
 
     @cached_property
@@ -58,9 +105,53 @@ class SQLAlchemySetting(BaseSettings):
             )
         )
 
+    @cached_property
+    def replica_url(self) -> str | None:
+        if not self.replica_host:
+            return None
+
+        return str(
+            PostgresDsn.build(
+                scheme=f"postgresql+{self.driver}",
+                username=self.username,
+                password=self.password,
+                host=self.replica_host,
+                port=self.replica_port or self.port,
+                path=self.name,
+            )
+        )
+
+    @cached_property
+    def dsn(self) -> str:
+        # libpq connection string for using psycopg directly, e.g. LISTEN/NOTIFY
+        return str(
+            PostgresDsn.build(
+                scheme="postgresql",
+                username=self.username,
+                password=self.password,
+                host=self.host,
+                port=self.port,
+                path=self.name,
+            )
+        )
+
+    @property
+    def connect_args(self) -> dict[str, Any]:
+        connect_args: dict[str, Any] = {"connect_timeout": max(int(self.connect_timeout), 1)}
+        if self.driver == "psycopg":
+            connect_args["prepare_threshold"] = self.prepare_threshold
+        return connect_args
+
+    def get_async_engine_config(self, url: str) -> dict[str, Any]:
+        return self.model_dump(include=self.ENGINE_CONFIG_FIELDS) | {
+            "url": url,
+            "connect_args": self.connect_args,
+            "poolclass": InstrumentedAsyncAdaptedQueuePool,
+        }
+
     @cached_property
     def sync_engine(self) -> Engine:
-        config = self.model_dump(include=self.ENGINE_CONFIG_FIELDS) | {"url": self.url}
+        config = self.model_dump(include=self.ENGINE_CONFIG_FIELDS) | {"url": self.url, "connect_args": self.connect_args}
         return create_engine(**config)
 
     @cached_property
@@ -70,14 +161,27 @@ class SQLAlchemySetting(BaseSettings):
 
     @cached_property
     def async_engine(self) -> AsyncEngine:
-        config = self.model_dump(include=self.ENGINE_CONFIG_FIELDS) | {"url": self.url}
-        return async_engine_from_config(prefix="", configuration=config)
+        return async_engine_from_config(prefix="", configuration=self.get_async_engine_config(self.url))
 
     @cached_property
     def async_session_maker(self) -> async_sessionmaker[SQLModelAsyncSession]:
         config = self.model_dump(include=self.SESSION_MAKER_CONFIG_FIELDS)
         return async_sessionmaker(**config, bind=self.async_engine, class_=SQLModelAsyncSession)
 
+    @cached_property
+    def async_replica_engine(self) -> AsyncEngine | None:
+        if not self.replica_url:
+            return None
+
+        return async_engine_from_config(prefix="", configuration=self.get_async_engine_config(self.replica_url))
+
+    @cached_property
+    def async_read_only_session_maker(self) -> async_sessionmaker[SQLModelAsyncSession]:
+        # Transactions are started as READ ONLY, on the replica if configured, otherwise on the primary's pool.
+        engine = (self.async_replica_engine or self.async_engine).execution_options(postgresql_readonly=True)
+        config = self.model_dump(include=self.SESSION_MAKER_CONFIG_FIELDS)
+        return async_sessionmaker(**config, bind=engine, class_=SQLModelAsyncSession)
+
     def sync_cleanup(self) -> None:
         if hasattr(self, "sync_session_maker"):
             del self.sync_session_maker
@@ -87,6 +191,14 @@ class SQLAlchemySetting(BaseSettings):
                 del self.sync_engine
 
     async def async_cleanup(self) -> None:
+        if "async_read_only_session_maker" in self.__dict__:
+            del self.async_read_only_session_maker
+
+        if "async_replica_engine" in self.__dict__:
+            if self.async_replica_engine:
+                await self.async_replica_engine.dispose()
+            del self.async_replica_engine
+
         if hasattr(self, "async_session_maker"):
             del self.async_session_maker
 
@@ -95,6 +207,40 @@ class SQLAlchemySetting(BaseSettings):
                 del self.async_engine
 
 
+class ExecutorSetting(BaseSettings):
+    # Process pool for CPU-bound jobs, see src.executors.process_pool
+    enabled: bool = True
+    workers: int = 0  # 0 to share the CPU cores among the uvicorn workers
+    max_pending: int = 64
+    job_timeout: float = 60.0
+
+
+class JobRunnerSetting(BaseSettings):
+    # Background jobs, see src.executors.background. Disable it to run the jobs in separate `run-jobs` processes instead.
+    enabled: bool = True
+    poll_interval: float = 1.0
+    heartbeat_interval: float = 5.0  # Also how often the progress of a running job is written
+    lease_timeout: float = 60.0
+    max_attempts: int = 3
+    concurrency: dict[JobType, int] = {  # Jobs of each type running at once, per process
+        JobType.ISO_DOWNLOAD: 1,
+        JobType.ISO_BUILD: 1,
+        JobType.DEVICE_IMPORT: 2,
+        JobType.CONFIG_LINT: 1,
+    }
+
+
+class IsoBuildSetting(BaseSettings):
+    # Base ISOs are read from input_dir, and built ISOs are cached under output_dir, as laid out by the Makefile.
+    input_dir: Path = Path("input")
+    output_dir: Path = Path("output")
+    base_iso_name: str = "ubuntu-24.04.3-live-server-amd64.iso"
+    nocloud_url: str = "http://autoinstall-manager.local/nocloud/"
+    volume_id: str = "UBUNTU_AUTOINSTALL"
+    # Chunk store mirroring upstream and built ISOs, see src.stores.chunk.ChunkStore.
+    mirror_dir: Path = Path("output") / "mirror"
+
+
 class ProjectInfoSetting(BaseSettings):
     title: str
     description: str
@@ -144,6 +290,9 @@ class OpenAPISetting(BaseSettings):
 class ProjectSetting(BaseSettings):
     sqlalchemy: SQLAlchemySetting
     server: ServerSetting
+    executor: ExecutorSetting = ExecutorSetting()
+    iso: IsoBuildSetting = IsoBuildSetting()
+    job: JobRunnerSetting = JobRunnerSetting()
 
     openapi: OpenAPISetting = OpenAPISetting()
     project_info: ProjectInfoSetting = ProjectInfoSetting.from_pyproject()
@@ -170,11 +319,22 @@ class ProjectSetting(BaseSettings):
 
         return project_config | openapi_config | server_config
 
+    @property
+    def executor_workers(self) -> int:
+        return self.executor.workers or max((cpu_count() or 1) // self.server.worker_count, 1)
+
     def to_uvicorn_config(self) -> Config:
+        # The app is created by the factory inside each worker process, so are its settings and engines.
         return Config(
             app="src:create_app",
             factory=True,
             host=self.server.host,
             port=self.server.port,
             reload=self.server.debug,
+            workers=self.server.worker_count,
+            loop=self.server.loop,
+            http=self.server.http,
+            backlog=self.server.backlog,
+            timeout_keep_alive=self.server.timeout_keep_alive,
+            limit_concurrency=self.server.limit_concurrency,
         )
@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+from bisect import bisect_right
+from collections.abc import Iterable, Iterator
+from contextlib import suppress
+from datetime import UTC, datetime
+from functools import partial
+from hashlib import sha256
+from pathlib import Path
+from re import compile
+from uuid import uuid4
+from zlib import crc32
+
+from pydantic import ValidationError
+from src.schemas.chunk_store import ChunkManifest, ChunkStoreUsage
+
+BLOCK_SIZE = 2048  # ISO9660 sector, data only ever moves by whole sectors between near-identical images
+MIN_CHUNK_SIZE = 256 * 1024
+MAX_CHUNK_SIZE = 4 * 1024 * 1024
+BOUNDARY_MASK = (1 << 9) - 1  # A block ends a chunk with a 1/512 chance, about 1 MiB past MIN_CHUNK_SIZE on average
+READ_SIZE = 4 * 1024 * 1024
+
+NAME_PATTERN = compile(r"^[\w.-]+$")
+
+
+def find_boundary(buffer: bytearray | memoryview, start: int) -> tuple[int | None, int]:
+    """
+    Returns the end of the chunk starting the buffer if it is found, and where to resume scanning otherwise.
+    A chunk ends after a block whose CRC32 matches BOUNDARY_MASK, so the boundaries only depend on the content around them,
+    and realign right after an inserted, removed or modified region.
+    """
+    view = memoryview(buffer)
+    offset = max(start, MIN_CHUNK_SIZE - BLOCK_SIZE)
+    while offset + BLOCK_SIZE <= len(view):
+        end = offset + BLOCK_SIZE
+        if end >= MAX_CHUNK_SIZE or not crc32(view[offset:end]) & BOUNDARY_MASK:
+            return end, end
+        offset = end
+    return None, offset
+
+
+def split_chunks(stream: Iterable[bytes]) -> Iterator[bytes]:
+    buffer, scanned = bytearray(), 0
+    for data in stream:
+        buffer += data
+        while True:
+            boundary, scanned = find_boundary(buffer, scanned)
+            if boundary is None:
+                break
+            yield bytes(buffer[:boundary])
+            del buffer[:boundary]
+            scanned = 0
+    if buffer:
+        yield bytes(buffer)
+
+
+class ChunkStore:
+    """
+    Content-addressed store of artifacts (upstream and built ISOs) split into content-defined chunks.
+    Chunks are shared between every artifact containing them, so near-identical images (point releases, per-site builds)
+    only add their differing chunks. Artifacts are reassembled from their manifest when read.
+
+    Layout: `chunks/<first 2 hex>/<sha256>` and `manifests/<name>.json`, the manifest being written last.
+    """
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+        self.chunk_dir = root / "chunks"
+        self.manifest_dir = root / "manifests"
+
+    def chunk_path(self, digest: str) -> Path:
+        return self.chunk_dir / digest[:2] / digest
+
+    def manifest_path(self, name: str) -> Path:
+        if not NAME_PATTERN.fullmatch(name):
+            raise ValueError(f"Invalid artifact name: {name}")
+        return self.manifest_dir / f"{name}.json"
+
+    def put_chunk(self, data: bytes) -> str:
+        digest = sha256(data).hexdigest()
+        if not (path := self.chunk_path(digest)).exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = path.with_name(f"{digest}.{uuid4().hex}.tmp")
+            temp_path.write_bytes(data)
+            temp_path.replace(path)
+        return digest
+
+    def ingest(self, name: str, stream: Iterable[bytes]) -> ChunkManifest:
+        # Blocking, run it in a worker thread from async code.
+        manifest_path = self.manifest_path(name)
+        artifact_sha256 = sha256()
+        chunks: list[tuple[str, int]] = []
+        for chunk in split_chunks(stream):
+            artifact_sha256.update(chunk)
+            chunks.append((self.put_chunk(chunk), len(chunk)))
+
+        manifest = ChunkManifest(
+            name=name,
+            size=sum(size for _, size in chunks),
+            sha256=artifact_sha256.hexdigest(),
+            chunks=chunks,
+            created_at=datetime.now(tz=UTC),
+        )
+        self.manifest_dir.mkdir(parents=True, exist_ok=True)
+        temp_path = manifest_path.with_name(f"{manifest_path.name}.{uuid4().hex}.tmp")
+        temp_path.write_text(manifest.model_dump_json())
+        temp_path.replace(manifest_path)
+        return manifest
+
+    def ingest_file(self, name: str, path: Path) -> ChunkManifest:
+        with path.open("rb") as f:
+            return self.ingest(name, iter(partial(f.read, READ_SIZE), b""))
+
+    def get_manifest(self, name: str) -> ChunkManifest | None:
+        with suppress(OSError, ValueError, ValidationError):
+            return ChunkManifest.model_validate_json(self.manifest_path(name).read_bytes())
+        return None
+
+    def list_manifests(self) -> list[ChunkManifest]:
+        paths = sorted(self.manifest_dir.glob("*.json")) if self.manifest_dir.is_dir() else []
+        return [manifest for path in paths if (manifest := self.get_manifest(path.stem))]
+
+    def iter_range(self, manifest: ChunkManifest, start: int = 0, end: int | None = None) -> Iterator[bytes]:
+        """Yields the bytes [start, end) of the artifact, reading only the chunks overlapping the range."""
+        end = manifest.size if end is None else min(end, manifest.size)
+        offsets = manifest.offsets()
+        index = bisect_right(offsets, start) - 1
+        while start < end and index < len(manifest.chunks):
+            digest, size = manifest.chunks[index]
+            chunk_start = offsets[index]
+            with self.chunk_path(digest).open("rb") as f:
+                f.seek(start - chunk_start)
+                data = f.read(min(chunk_start + size, end) - start)
+            if not data:
+                raise OSError(f"Chunk {digest} of {manifest.name} is truncated.")
+            yield data
+            start += len(data)
+            index += 1
+
+    def usage(self) -> ChunkStoreUsage:
+        manifests = self.list_manifests()
+        chunk_paths = [path for path in self.chunk_dir.glob("*/*") if not path.name.endswith(".tmp")] if self.chunk_dir.is_dir() else []
+        return ChunkStoreUsage(
+            artifacts=len(manifests),
+            logical_size=sum(manifest.size for manifest in manifests),
+            physical_size=sum(path.stat().st_size for path in chunk_paths),
+            chunks=len(chunk_paths),
+        )
+
+    def remove(self, name: str) -> None:
+        self.manifest_path(name).unlink(missing_ok=True)
+
+    def prune(self) -> int:
+        # Removes the chunks no manifest refers to anymore. Not safe to run while an artifact is being ingested.
+        referenced = {digest for manifest in self.list_manifests() for digest, _ in manifest.chunks}
+        removed = 0
+        for path in self.chunk_dir.glob("*/*") if self.chunk_dir.is_dir() else []:
+            if path.name not in referenced:
+                path.unlink(missing_ok=True)
+                removed += 1
+        return removed
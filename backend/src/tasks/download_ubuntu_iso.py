@@ -1,9 +1,12 @@
-from hashlib import sha256
+from asyncio import to_thread
+from collections.abc import Callable
 from operator import itemgetter
 from pathlib import Path
 from typing import Literal, TypedDict
 
 from httpx import AsyncClient, AsyncHTTPTransport
+from src.utils.checksumlib import cached_file_sha256
+from src.utils.downloadlib import SegmentedDownload
 
 UBUNTU_SERIES_LIST_URL = "https://api.launchpad.net/devel/ubuntu/series"
 
@@ -39,8 +42,13 @@ async def list_ubuntu_iso_versions(lts: bool = False) -> list[str]:
     return sorted(versions, reverse=True)
 
 
-async def download_latest_ubuntu_iso(destination: Path, lts: bool = True, print_progress: bool = False) -> Path:
-    calculated_sha256 = sha256()
+async def download_latest_ubuntu_iso(
+    destination: Path,
+    lts: bool = True,
+    print_progress: bool = False,
+    connections: int = 4,
+    on_progress: Callable[[int, int], None] | None = None,
+) -> Path:
     destination.mkdir(parents=True, exist_ok=True)
 
     if not (versions := await list_ubuntu_iso_versions(lts=lts)):
@@ -60,29 +68,19 @@ async def download_latest_ubuntu_iso(destination: Path, lts: bool = True, print_
         iso_url = f"https://releases.ubuntu.com/{target_lts_version}/{target_iso_filename}"
         iso_path: Path = destination / target_iso_filename
 
-        if iso_path.exists():
-            print(f"{target_iso_filename} already exists. Verifying checksum...")
-            with iso_path.open("rb") as f:
-                while chunk := f.read(8192):
-                    calculated_sha256.update(chunk)
-        else:
-            async with client.stream("GET", iso_url) as response:
-                total = int(response.headers["Content-Length"])
-                if print_progress:
-                    print(f"Downloading {target_iso_filename} ({total} bytes)...")
-
-                async for chunk in response.aiter_bytes(chunk_size=8192):
-                    with iso_path.open("ab") as f:
-                        f.write(chunk)
-
-                    calculated_sha256.update(chunk)
-
-                    if print_progress:
-                        percent = response.num_bytes_downloaded / total * 100
-                        print(f"\r{percent:.2f}%", end="", flush=True)
-
-    print(f"{calculated_sha256.hexdigest()=}  {target_iso_sha256=}")
-    if calculated_sha256.hexdigest() != target_iso_sha256:
+        # The ISO is only moved to iso_path once fully downloaded and verified, an interrupted download resumes from `<iso>.part`.
+        if not iso_path.exists():
+            if print_progress:
+                print(f"Downloading {target_iso_filename}...")
+            download = SegmentedDownload(client, iso_url, iso_path, connections, print_progress=print_progress, on_progress=on_progress)
+            return await download.run(expected_sha256=target_iso_sha256)
+
+    if print_progress:
+        print(f"{target_iso_filename} already exists. Verifying checksum...")
+    calculated_sha256 = await to_thread(cached_file_sha256, iso_path)
+    if print_progress:
+        print(f"{calculated_sha256=}  {target_iso_sha256=}")
+    if calculated_sha256 != target_iso_sha256:
         iso_path.unlink(missing_ok=True)
         raise Exception("SHA256 checksum mismatch. Download may be corrupted. File has been deleted.")
 
@@ -0,0 +1,64 @@
+from asyncio import to_thread
+from typing import Any
+
+from src.executors.background import JobContext, JobHandler
+from src.repositories.config_node import ConfigNodeRepository
+from src.repositories.device import DeviceRepository
+from src.schemas.iso_build import IsoBuildRequest
+from src.schemas.job import ConfigLintJobPayload, DeviceImportJobPayload, IsoDownloadJobPayload, JobType
+from src.services.config_node import ConfigNodeService
+from src.services.device import DeviceService
+from src.stores.chunk import ChunkStore
+from src.tasks.download_ubuntu_iso import download_latest_ubuntu_iso
+
+LINT_RESULT_LIMIT = 1000  # Invalid ConfigNodes kept in the job result, GET /confignode/lint streams all of them
+
+
+async def download_iso(context: JobContext) -> dict[str, Any]:
+    payload = IsoDownloadJobPayload.model_validate(context.job.payload)
+    iso_path = await download_latest_ubuntu_iso(context.config.iso.input_dir, lts=payload.lts, on_progress=context.report_progress)
+    result: dict[str, Any] = {"name": iso_path.name}
+    if payload.mirror:
+        manifest = await to_thread(ChunkStore(context.config.iso.mirror_dir).ingest_file, iso_path.name, iso_path)
+        result["sha256"] = manifest.sha256
+    return result
+
+
+async def build_iso(context: JobContext) -> dict[str, Any]:
+    iso_builder = context.runner.iso_builder
+    prepared = await iso_builder.prepare(IsoBuildRequest.model_validate(context.job.payload))
+    # Another job may have built the same key since this one was queued.
+    if not await iso_builder.get_artifact(prepared.key):
+        await iso_builder.build(prepared)
+    return {"key": prepared.key}
+
+
+async def import_devices(context: JobContext) -> dict[str, Any]:
+    payload = DeviceImportJobPayload.model_validate(context.job.payload)
+    async with context.config.sqlalchemy.async_session_maker() as session:
+        repository = DeviceRepository(session=session, tree_cache=context.runner.tree_cache, executor=context.runner.executor)
+        result = await DeviceService(repository=repository).bulk_import(content=payload.content.encode(), format=payload.format)
+        await session.commit()
+    return result.model_dump(mode="json")
+
+
+async def lint_configs(context: JobContext) -> dict[str, Any]:
+    ConfigLintJobPayload.model_validate(context.job.payload)
+    invalid, devices = 0, 0
+    results: list[dict[str, Any]] = []
+    async with context.config.sqlalchemy.async_read_only_session_maker() as session:
+        repository = ConfigNodeRepository(session=session, tree_cache=context.runner.tree_cache, executor=context.runner.executor)
+        async for result in ConfigNodeService(repository=repository).lint(on_progress=context.report_progress):
+            invalid += 1
+            devices += len(result.device_ids)
+            if len(results) < LINT_RESULT_LIMIT:
+                results.append(result.model_dump(mode="json"))
+    return {"invalid_config_nodes": invalid, "affected_devices": devices, "results": results}
+
+
+JOB_HANDLERS: dict[JobType, JobHandler] = {
+    JobType.ISO_DOWNLOAD: download_iso,
+    JobType.ISO_BUILD: build_iso,
+    JobType.DEVICE_IMPORT: import_devices,
+    JobType.CONFIG_LINT: lint_configs,
+}
@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+from collections.abc import Iterator
+from contextlib import contextmanager, suppress
+from fcntl import LOCK_EX, flock
+from hashlib import file_digest
+from os import stat_result
+from pathlib import Path
+from uuid import uuid4
+
+from pydantic import BaseModel, RootModel, ValidationError
+
+CHECKSUM_INDEX_NAME = ".sha256-index.json"
+CHECKSUM_INDEX_LOCK_NAME = ".sha256-index.json.lock"
+
+
+class ChecksumIndexEntry(BaseModel):
+    size: int
+    mtime_ns: int
+    inode: int
+    sha256: str
+
+    def matches(self, stat: stat_result) -> bool:
+        return (self.size, self.mtime_ns, self.inode) == (stat.st_size, stat.st_mtime_ns, stat.st_ino)
+
+
+class ChecksumIndex(RootModel[dict[str, ChecksumIndexEntry]]):
+    """Sidecar index of verified digests in a directory, keyed by file name. An entry is only trusted while the file's stat is unchanged."""
+
+    root: dict[str, ChecksumIndexEntry] = {}
+
+    @classmethod
+    def load(cls, directory: Path) -> ChecksumIndex:
+        with suppress(OSError, ValidationError):
+            return cls.model_validate_json((directory / CHECKSUM_INDEX_NAME).read_bytes())
+        return cls()
+
+    def save(self, directory: Path) -> None:
+        path = directory / CHECKSUM_INDEX_NAME
+        temp_path = path.with_name(f"{path.name}.{uuid4().hex}.tmp")
+        temp_path.write_text(self.model_dump_json())
+        temp_path.replace(path)
+
+    @classmethod
+    @contextmanager
+    def locked(cls, directory: Path) -> Iterator[None]:
+        # Serializes the read-modify-write of the index across threads and processes, e.g. uvicorn workers and run-jobs.
+        # A separate lock file, as saving replaces the index file itself.
+        with (directory / CHECKSUM_INDEX_LOCK_NAME).open("a") as lock_file:
+            flock(lock_file, LOCK_EX)
+            yield
+
+
+def file_sha256(path: Path) -> str:
+    # file_digest reads into a reusable buffer and releases the GIL while hashing, so it is best run in a worker thread.
+    with path.open("rb") as f:
+        return file_digest(f, "sha256").hexdigest()
+
+
+def record_file_sha256(path: Path, sha256: str, stat: stat_result | None = None) -> None:
+    stat = stat or path.stat()
+    with ChecksumIndex.locked(path.parent):
+        index = ChecksumIndex.load(path.parent)
+        index.root[path.name] = ChecksumIndexEntry(size=stat.st_size, mtime_ns=stat.st_mtime_ns, inode=stat.st_ino, sha256=sha256)
+        index.save(path.parent)
+
+
+def indexed_file_sha256(path: Path, stat: stat_result | None = None) -> str | None:
+    """The recorded digest of the file if its size, mtime and inode are unchanged since it was hashed, without reading the file."""
+    stat = stat or path.stat()
+    if (entry := ChecksumIndex.load(path.parent).root.get(path.name)) and entry.matches(stat):
+        return entry.sha256
+    return None
+
+
+def cached_file_sha256(path: Path) -> str:
+    """file_sha256, but only rehashes the file when its size, mtime or inode changed since it was last hashed."""
+    stat = path.stat()
+    if sha256 := indexed_file_sha256(path, stat):
+        return sha256
+
+    sha256 = file_sha256(path)
+    # Not cached when the file was modified while being hashed.
+    if (new_stat := path.stat()).st_mtime_ns == stat.st_mtime_ns and new_stat.st_size == stat.st_size:
+        record_file_sha256(path, sha256, stat)
+    return sha256
@@ -0,0 +1,21 @@
+from json import dumps
+from typing import Any
+
+CLOUD_CONFIG_HEADER = "#cloud-config\n"
+
+
+def dump_json(obj: Any) -> bytes:
+    # JSON is a subset of YAML 1.2, so cloud-init's YAML loader can read this as-is.
+    return dumps(obj, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def render_user_data(autoinstall_config: dict[str, Any]) -> bytes:
+    return CLOUD_CONFIG_HEADER.encode() + dump_json({"autoinstall": autoinstall_config}) + b"\n"
+
+
+def render_meta_data(instance_id: str, local_hostname: str) -> bytes:
+    return dump_json({"instance-id": instance_id, "local-hostname": local_hostname}) + b"\n"
+
+
+def render_vendor_data() -> bytes:
+    return b""
@@ -0,0 +1,224 @@
+from __future__ import annotations
+
+from asyncio import TaskGroup, sleep, to_thread
+from collections.abc import Callable, Iterator
+from contextlib import suppress
+from os import fsync, pwrite
+from pathlib import Path
+from time import monotonic
+from typing import BinaryIO
+
+from httpx import AsyncClient, Response, TransportError
+from pydantic import BaseModel, ValidationError
+from src.utils.checksumlib import file_sha256, record_file_sha256
+
+SEGMENT_SIZE = 32 * 1024 * 1024
+WRITE_BUFFER_SIZE = 4 * 1024 * 1024
+FETCH_RETRIES = 5
+PROGRESS_INTERVAL = 0.5  # seconds
+
+
+class DownloadError(Exception):
+    pass
+
+
+class SegmentMap(BaseModel):
+    """Persisted next to the partial file, so that an interrupted download resumes from its completed segments."""
+
+    url: str
+    size: int
+    validator: str  # ETag (or Last-Modified) of the remote file, the segments are only reused while it is unchanged
+    segment_size: int
+    completed: set[int] = set()
+
+    @property
+    def segment_count(self) -> int:
+        return -(-self.size // self.segment_size)
+
+    def segment_range(self, index: int) -> tuple[int, int]:
+        start = index * self.segment_size
+        return start, min(start + self.segment_size, self.size)
+
+    def pending(self) -> Iterator[tuple[int, int, int]]:
+        return ((index, *self.segment_range(index)) for index in range(self.segment_count) if index not in self.completed)
+
+    @property
+    def downloaded(self) -> int:
+        return sum(end - start for start, end in map(self.segment_range, self.completed))
+
+    @classmethod
+    def load(cls, path: Path) -> SegmentMap | None:
+        with suppress(OSError, ValidationError):
+            return cls.model_validate_json(path.read_bytes())
+        return None
+
+    def save(self, path: Path) -> None:
+        temp_path = path.with_name(path.name + ".tmp")
+        temp_path.write_text(self.model_dump_json())
+        temp_path.replace(path)
+
+
+class PositionalWriter:
+    """
+    Buffers a stream into a large reusable buffer, and writes it at its position of the shared file handle with pwrite.
+    Writes run in a worker thread, so that the event loop never waits on the disk.
+    """
+
+    def __init__(self, file: BinaryIO) -> None:
+        self.fd = file.fileno()
+        self.buffer = bytearray(WRITE_BUFFER_SIZE)
+        self.view = memoryview(self.buffer)
+        self.filled = 0
+        self.flushed_offset = 0
+
+    @property
+    def offset(self) -> int:
+        return self.flushed_offset + self.filled
+
+    def seek(self, offset: int) -> None:
+        if self.filled:
+            raise RuntimeError("PositionalWriter must be flushed before seeking")
+        self.flushed_offset = offset
+
+    async def write(self, chunk: bytes) -> None:
+        data = memoryview(chunk)
+        while data:
+            size = min(len(data), len(self.buffer) - self.filled)
+            self.view[self.filled : self.filled + size] = data[:size]
+            self.filled += size
+            data = data[size:]
+            if self.filled == len(self.buffer):
+                await self.flush()
+
+    async def flush(self) -> None:
+        written = 0
+        while written < self.filled:
+            written += await to_thread(pwrite, self.fd, self.view[written : self.filled], self.flushed_offset + written)
+        self.flushed_offset += self.filled
+        self.filled = 0
+
+
+class SegmentedDownload:
+    """
+    Downloads a file with HTTP Range requests over several connections into `<destination>.part`, then moves it into place.
+    Completed segments are recorded in `<destination>.part.json`, and a dropped connection resumes from the last received byte.
+    Servers without Range support fall back to a single, non-resumable stream.
+    """
+
+    def __init__(
+        self,
+        client: AsyncClient,
+        url: str,
+        destination: Path,
+        connections: int = 4,
+        print_progress: bool = False,
+        on_progress: Callable[[int, int], None] | None = None,  # Called with (downloaded, total) bytes on every received chunk
+    ) -> None:
+        self.client = client
+        self.url = url
+        self.destination = destination
+        self.part_path = destination.with_name(destination.name + ".part")
+        self.map_path = destination.with_name(destination.name + ".part.json")
+        self.connections = connections
+        self.print_progress = print_progress
+        self.on_progress = on_progress
+
+        self.total = 0
+        self.downloaded = 0
+        self.progress_printed_at = 0.0
+
+    def report_progress(self, size: int) -> None:
+        self.downloaded += size
+        if self.on_progress and self.total:
+            self.on_progress(self.downloaded, self.total)
+        if self.print_progress and self.total and (now := monotonic()) - self.progress_printed_at >= PROGRESS_INTERVAL:
+            self.progress_printed_at = now
+            print(f"\r{self.downloaded / self.total * 100:.2f}%", end="", flush=True)
+
+    async def fetch(self, writer: PositionalWriter, start: int, end: int | None, validator: str | None) -> None:
+        # Retried from the last received byte, as the transport's retries only cover establishing connections.
+        writer.seek(start)
+        for attempt in range(FETCH_RETRIES):
+            if not validator and writer.offset != start:
+                # Without Range support, a retry starts over from the beginning.
+                self.downloaded -= writer.offset - start
+                writer.seek(start)
+
+            headers = {"Accept-Encoding": "identity"}
+            if validator:
+                headers |= {"Range": f"bytes={writer.offset}-{end - 1 if end else ''}", "If-Range": validator}
+            try:
+                async with self.client.stream("GET", self.url, headers=headers, follow_redirects=True) as response:
+                    response.raise_for_status()
+                    if validator and response.status_code != 206:
+                        raise DownloadError(f"{self.url} has changed while downloading.")
+                    async for chunk in response.aiter_raw():
+                        await writer.write(chunk)
+                        self.report_progress(len(chunk))
+                await writer.flush()
+                if end is None or writer.offset >= end:
+                    return
+            except TransportError:
+                await writer.flush()
+                if attempt == FETCH_RETRIES - 1:
+                    raise
+                await sleep(2**attempt)
+        raise DownloadError(f"{self.url} ended early at byte {writer.offset}.")
+
+    async def fetch_segments(self, file: BinaryIO, segment_map: SegmentMap, segments: Iterator[tuple[int, int, int]]) -> None:
+        # Every connection takes the next pending segment from the shared iterator.
+        writer = PositionalWriter(file)
+        for index, start, end in segments:
+            await self.fetch(writer, start, end, segment_map.validator)
+            segment_map.completed.add(index)
+            await to_thread(segment_map.save, self.map_path)
+
+    def open_part(self, segment_map: SegmentMap | None) -> BinaryIO:
+        if segment_map and segment_map.completed and self.part_path.exists():
+            return self.part_path.open("r+b", buffering=0)
+
+        file = self.part_path.open("w+b", buffering=0)
+        if segment_map:
+            file.truncate(segment_map.size)
+        return file
+
+    def resumable_map(self, head: Response) -> SegmentMap | None:
+        size = int(head.headers.get("Content-Length", 0))
+        validator = head.headers.get("ETag") or head.headers.get("Last-Modified")
+        if not (head.headers.get("Accept-Ranges") == "bytes" and size and validator):
+            return None
+
+        if (saved := SegmentMap.load(self.map_path)) and (saved.url, saved.size, saved.validator) == (self.url, size, validator):
+            return saved
+        return SegmentMap(url=self.url, size=size, validator=validator, segment_size=SEGMENT_SIZE)
+
+    async def run(self, expected_sha256: str | None = None) -> Path:
+        head = (await self.client.head(self.url, headers={"Accept-Encoding": "identity"}, follow_redirects=True)).raise_for_status()
+        segment_map = self.resumable_map(head)
+        self.total = int(head.headers.get("Content-Length", 0))
+        self.downloaded = segment_map.downloaded if segment_map else 0
+
+        with self.open_part(segment_map) as file:
+            if segment_map:
+                await to_thread(segment_map.save, self.map_path)
+                segments = segment_map.pending()
+                async with TaskGroup() as tasks:
+                    for _ in range(self.connections):
+                        tasks.create_task(self.fetch_segments(file, segment_map, segments))
+            else:
+                await self.fetch(PositionalWriter(file), 0, None, None)
+            await to_thread(fsync, file.fileno())
+        if self.print_progress:
+            print()
+
+        if expected_sha256 and (calculated_sha256 := await to_thread(file_sha256, self.part_path)) != expected_sha256:
+            self.part_path.unlink(missing_ok=True)
+            self.map_path.unlink(missing_ok=True)
+            raise DownloadError(f"SHA256 checksum mismatch ({calculated_sha256=}, {expected_sha256=}). The download has been deleted.")
+
+        self.part_path.replace(self.destination)
+        self.map_path.unlink(missing_ok=True)
+        if expected_sha256:
+            # The rename keeps the inode and mtime, so the digest stays valid for the verified file.
+            await to_thread(record_file_sha256, self.destination, expected_sha256)
+        return self.destination
@@ -0,0 +1,55 @@
+from hashlib import sha256
+from re import compile
+from typing import NamedTuple
+
+RANGE_PATTERN = compile(r"bytes=(?P<first>\d*)-(?P<last>\d*)")
+
+
+def make_etag(content: bytes) -> str:
+    # Strong validator, the same bytes always produce the same ETag across processes and deploys.
+    return f'"{sha256(content).hexdigest()}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """If-None-Match에 주어진 ETag 중 하나라도 일치하는지 확인합니다. (weak comparison, RFC 9110 13.1.2)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(candidate.strip().removeprefix("W/") == etag.removeprefix("W/") for candidate in if_none_match.split(","))
+
+
+class ByteRange(NamedTuple):
+    start: int
+    end: int  # Exclusive
+
+
+def parse_range(range_header: str | None, size: int) -> ByteRange | None:
+    """
+    Range 헤더의 단일 bytes 범위를 해석합니다. (RFC 9110 14.2)
+    헤더가 없거나, 해석할 수 없거나, 여러 범위를 요청하면 None을 반환하여 전체 내용을 응답하도록 하고,
+    만족할 수 없는 범위라면 ValueError를 발생시킵니다.
+    """
+    if not range_header or not (match := RANGE_PATTERN.fullmatch(range_header.strip())):
+        return None
+
+    first, last = match["first"], match["last"]
+    if not first and not last:
+        return None
+    if not first:  # Suffix range, the last N bytes
+        if not (length := int(last)) or not size:
+            raise ValueError(range_header)
+        return ByteRange(max(size - length, 0), size)
+
+    if last and int(last) < int(first):  # Invalid rather than unsatisfiable, e.g. bytes=5-3, so the header is ignored (RFC 9110 14.1.1)
+        return None
+
+    start, end = int(first), min(int(last) + 1, size) if last else size
+    if start >= size or start >= end:
+        raise ValueError(range_header)
+    return ByteRange(start, end)
+
+
+def if_range_matches(if_range: str | None, etag: str) -> bool:
+    # If-Range only allows the strong comparison, and dates are never matched as only the ETag validates the content.
+    return if_range is None or (not if_range.startswith("W/") and if_range.strip() == etag)
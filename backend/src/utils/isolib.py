@@ -0,0 +1,239 @@
+from __future__ import annotations
+
+from collections.abc import Iterator, Sequence
+from functools import cached_property
+from itertools import starmap
+from mmap import ACCESS_READ, mmap
+from pathlib import Path
+from struct import pack, unpack_from
+from types import TracebackType
+from typing import NamedTuple
+
+SECTOR_SIZE = 2048
+FIRST_VOLUME_DESCRIPTOR_SECTOR = 16
+PRIMARY_VOLUME_DESCRIPTOR = 1
+SUPPLEMENTARY_VOLUME_DESCRIPTOR = 2
+VOLUME_DESCRIPTOR_SET_TERMINATOR = 255
+JOLIET_ESCAPE_SEQUENCES = (b"%/@", b"%/C", b"%/E")
+
+VOLUME_ID_OFFSET = 40
+VOLUME_ID_SIZE = 32
+VOLUME_SPACE_SIZE_OFFSET = 80
+JOLIET_ESCAPE_SEQUENCE_OFFSET = 88
+ROOT_DIRECTORY_RECORD_OFFSET = 156
+
+DIRECTORY_FLAG = 0x02
+READ_CHUNK_SIZE = 1024 * 1024
+
+
+def align(size: int) -> int:
+    return -(-size // SECTOR_SIZE) * SECTOR_SIZE
+
+
+def both_endian32(value: int) -> bytes:
+    return pack("<I", value) + pack(">I", value)
+
+
+class IsoDirectoryRecord(NamedTuple):
+    name: str  # Rock Ridge name when present, otherwise the ISO9660 identifier without its ";1" version
+    extent: int  # First sector of the data
+    size: int
+    is_directory: bool
+    offset: int  # Byte offset of the record itself within the image
+
+    @property
+    def start(self) -> int:
+        return self.extent * SECTOR_SIZE
+
+
+class IsoVolumeDescriptor(NamedTuple):
+    offset: int
+    joliet: bool  # Joliet supplementary volume, with UCS-2 identifiers
+    root: IsoDirectoryRecord
+
+
+def parse_rock_ridge_name(system_use: bytes) -> str | None:
+    # NM entries of the SUSP area, a long name may be split across several entries.
+    name, position = b"", 0
+    while position + 4 <= len(system_use):
+        signature, length = system_use[position : position + 2], system_use[position + 2]
+        if length < 4:
+            break
+        if signature == b"NM":
+            name += system_use[position + 5 : position + length]
+        position += length
+    return name.decode(errors="replace") if name else None
+
+
+def parse_directory_record(data: bytes | mmap, offset: int, joliet: bool = False) -> IsoDirectoryRecord:
+    length, flags, name_length = data[offset], data[offset + 25], data[offset + 32]
+    extent, size = unpack_from("<I4xI", data, offset + 2)  # Little-endian halves of the both-endian fields
+    identifier = bytes(data[offset + 33 : offset + 33 + name_length])
+    if joliet:
+        name = identifier.decode("utf-16-be", errors="replace").split(";")[0]
+    else:
+        system_use_offset = offset + 33 + name_length + (1 - name_length % 2)
+        rock_ridge_name = parse_rock_ridge_name(bytes(data[system_use_offset : offset + length]))
+        name = rock_ridge_name or identifier.decode(errors="replace").split(";")[0].rstrip(".")
+    return IsoDirectoryRecord(name=name, extent=extent, size=size, is_directory=bool(flags & DIRECTORY_FLAG), offset=offset)
+
+
+class IsoImage:
+    """
+    Read-only ISO9660 image, memory-mapped so that only the touched sectors (volume descriptor, directories, read files) are paged in.
+    Paths are matched case-insensitively against Rock Ridge names, falling back to the ISO9660 identifiers.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.file = path.open("rb")
+        self.data = mmap(self.file.fileno(), 0, access=ACCESS_READ)
+
+    def __enter__(self) -> IsoImage:
+        return self
+
+    def __exit__(self, exc_type: type[BaseException] | None, exc: BaseException | None, tb: TracebackType | None) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.data.close()
+        self.file.close()
+
+    @property
+    def size(self) -> int:
+        return len(self.data)
+
+    @cached_property
+    def volume_descriptors(self) -> list[IsoVolumeDescriptor]:
+        # The primary volume first, then the Joliet ones. Other supplementary volumes (and El Torito's boot record) are left alone.
+        descriptors: list[IsoVolumeDescriptor] = []
+        offset = FIRST_VOLUME_DESCRIPTOR_SECTOR * SECTOR_SIZE
+        while offset + SECTOR_SIZE <= self.size and self.data[offset + 1 : offset + 6] == b"CD001":
+            if (type := self.data[offset]) == VOLUME_DESCRIPTOR_SET_TERMINATOR:
+                break
+
+            escape_sequence = self.data[offset + JOLIET_ESCAPE_SEQUENCE_OFFSET : offset + JOLIET_ESCAPE_SEQUENCE_OFFSET + 3]
+            joliet = type == SUPPLEMENTARY_VOLUME_DESCRIPTOR and escape_sequence in JOLIET_ESCAPE_SEQUENCES
+            if type == PRIMARY_VOLUME_DESCRIPTOR or joliet:
+                root = parse_directory_record(self.data, offset + ROOT_DIRECTORY_RECORD_OFFSET, joliet=joliet)
+                descriptors.append(IsoVolumeDescriptor(offset=offset, joliet=joliet, root=root))
+            offset += SECTOR_SIZE
+
+        if not descriptors or descriptors[0].joliet:
+            raise ValueError(f"{self.path} is not an ISO9660 image.")
+        return descriptors
+
+    @property
+    def root(self) -> IsoDirectoryRecord:
+        return self.volume_descriptors[0].root
+
+    def list_directory(self, directory: IsoDirectoryRecord, joliet: bool = False) -> list[IsoDirectoryRecord]:
+        records: list[IsoDirectoryRecord] = []
+        offset, end = directory.start, directory.start + directory.size
+        while offset < end:
+            if not (length := self.data[offset]):
+                # Records never cross a sector boundary, the rest of the sector is padding.
+                offset = (offset // SECTOR_SIZE + 1) * SECTOR_SIZE
+                continue
+            if self.data[offset + 32] != 1 or self.data[offset + 33] not in (0, 1):  # Skip the "." and ".." entries
+                records.append(parse_directory_record(self.data, offset, joliet=joliet))
+            offset += length
+        return records
+
+    def find(self, path: str, descriptor: IsoVolumeDescriptor | None = None) -> IsoDirectoryRecord:
+        descriptor = descriptor or self.volume_descriptors[0]
+        record = descriptor.root
+        for part in filter(None, path.split("/")):
+            if not record.is_directory:
+                raise KeyError(path)
+            entries = {entry.name.casefold(): entry for entry in self.list_directory(record, joliet=descriptor.joliet)}
+            if (entry := entries.get(part.casefold())) is None:
+                raise KeyError(path)
+            record = entry
+        return record
+
+    def find_all(self, path: str) -> list[IsoDirectoryRecord]:
+        # The records of the same file in every directory tree, the primary one first.
+        records: list[IsoDirectoryRecord] = []
+        for descriptor in self.volume_descriptors:
+            try:
+                records.append(self.find(path, descriptor))
+            except KeyError:
+                if not descriptor.joliet:
+                    raise
+        return records
+
+    def read(self, record: IsoDirectoryRecord) -> bytes:
+        return self.data[record.start : record.start + record.size]
+
+    def read_file(self, path: str) -> bytes:
+        return self.read(self.find(path))
+
+
+class IsoPatch(NamedTuple):
+    offset: int
+    data: bytes
+
+
+class IsoOverlay:
+    """
+    Describes a modified copy of an ISO image as patches over the untouched base image, without copying it.
+    A replaced file is written over its old extent when it fits in the sectors that extent already occupies, otherwise it is appended
+    after the base image. Either way, only the file's directory records (in the primary and Joliet trees) are rewritten to point at it.
+    """
+
+    def __init__(self, image: IsoImage) -> None:
+        self.image = image
+        self.size = image.size
+        self.patches: dict[int, bytes] = {}
+
+    def replace_file(self, path: str, content: bytes) -> None:
+        records = self.image.find_all(path)
+        if records[0].size and len(content) <= align(records[0].size):
+            start = records[0].start
+        else:
+            start = align(self.size)
+            self.size = start + align(len(content))
+            for descriptor in self.image.volume_descriptors:
+                self.patches[descriptor.offset + VOLUME_SPACE_SIZE_OFFSET] = both_endian32(self.size // SECTOR_SIZE)
+
+        self.patches[start] = content.ljust(align(len(content)), b"\0")
+        for record in records:
+            # The both-endian extent and data length fields are adjacent, right after the record length bytes.
+            self.patches[record.offset + 2] = both_endian32(start // SECTOR_SIZE) + both_endian32(len(content))
+
+    def set_volume_id(self, volume_id: str) -> None:
+        for descriptor in self.image.volume_descriptors:
+            if descriptor.joliet:
+                data = volume_id[: VOLUME_ID_SIZE // 2].ljust(VOLUME_ID_SIZE // 2).encode("utf-16-be")
+            else:
+                data = volume_id[:VOLUME_ID_SIZE].ljust(VOLUME_ID_SIZE).encode("ascii")
+            self.patches[descriptor.offset + VOLUME_ID_OFFSET] = data
+
+    def get_patches(self) -> list[IsoPatch]:
+        return list(starmap(IsoPatch, sorted(self.patches.items())))
+
+
+def read_overlay(image: IsoImage, patches: Sequence[IsoPatch], size: int, start: int = 0, end: int | None = None) -> Iterator[bytes]:
+    """Yields the bytes [start, end) of a patched image, reading the unpatched parts from the base image's memory map in chunks."""
+
+    def read_base(start: int, end: int) -> Iterator[bytes]:
+        for offset in range(start, end, READ_CHUNK_SIZE):
+            chunk_end = min(offset + READ_CHUNK_SIZE, end)
+            chunk = image.data[offset : min(chunk_end, image.size)] if offset < image.size else b""
+            yield chunk.ljust(chunk_end - offset, b"\0")  # Gap between the base image and the appended extents
+
+    end = size if end is None else min(end, size)
+    position = start
+    for patch in patches:
+        patch_end = patch.offset + len(patch.data)
+        if patch_end <= position:
+            continue
+        if patch.offset >= end:
+            break
+
+        patch_start = max(patch.offset, position)
+        yield from read_base(position, patch_start)
+        position = min(patch_end, end)
+        yield patch.data[patch_start - patch.offset : position - patch.offset]
+    yield from read_base(position, end)
@@ -0,0 +1,31 @@
+from typing import Any
+
+# Value that removes the inherited key, e.g. {"apt": {"proxy": "$delete"}}
+DELETE_MARKER = "$delete"
+# Key suffix that appends to the inherited list instead of replacing it, e.g. {"packages+": ["vim"]}
+APPEND_SUFFIX = "+"
+
+
+def deep_merge(base: dict[str, Any], override: dict[str, Any]) -> dict[str, Any]:
+    """
+    Merge override on top of base without mutating either of them.
+    - dict values are merged recursively.
+    - list values replace the inherited list, unless the key ends with APPEND_SUFFIX.
+    - DELETE_MARKER removes the inherited key.
+    - any other value replaces the inherited value.
+    Untouched nested values are shared with base, so the result must be treated as read-only.
+    """
+    result = base.copy()
+    for key, value in override.items():
+        if key.endswith(APPEND_SUFFIX) and isinstance(value, list):
+            key = key.removesuffix(APPEND_SUFFIX)
+            inherited = result.get(key)
+            result[key] = (inherited if isinstance(inherited, list) else []) + value
+        elif value == DELETE_MARKER:
+            result.pop(key, None)
+        elif isinstance(value, dict):
+            inherited = result.get(key)
+            result[key] = deep_merge(inherited if isinstance(inherited, dict) else {}, value)
+        else:
+            result[key] = value
+    return result
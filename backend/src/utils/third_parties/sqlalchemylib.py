@@ -0,0 +1,99 @@
+from asyncio import gather, sleep
+from json import dumps, loads
+from logging import getLogger
+from time import perf_counter
+from typing import Any, TypedDict
+
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.engine.interfaces import Dialect
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio.engine import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, ConnectionPoolEntry
+from sqlalchemy.types import TypeDecorator
+
+logger = getLogger(__name__)
+
+
+class JSONBText(TypeDecorator[str]):
+    """
+    JSONB column exposed as its JSON serialized string, so that the API keeps exchanging the raw document.
+    Use `type_coerce(column, JSONB)` in queries to operate on (or fetch) the parsed value instead.
+    """
+
+    impl = JSONB
+    cache_ok = True
+
+    def process_bind_param(self, value: str | dict[str, Any] | None, dialect: Dialect) -> Any:
+        return loads(value) if isinstance(value, str) else value
+
+    def process_result_value(self, value: Any, dialect: Dialect) -> str | None:
+        return None if value is None else dumps(value, ensure_ascii=False)
+
+
+class PoolStats(TypedDict):
+    size: int
+    checked_in: int
+    checked_out: int
+    overflow: int
+    checkouts: int
+    checkout_timeouts: int
+    checkout_wait_avg: float  # seconds
+    checkout_wait_max: float  # seconds
+
+
+class InstrumentedAsyncAdaptedQueuePool(AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool which also records how long the checkouts waited for a connection."""
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.checkout_timeouts = 0
+        self.checkout_wait_total = 0.0
+        self.checkout_wait_max = 0.0
+
+    def _do_get(self) -> ConnectionPoolEntry:
+        started_at = perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            self.checkout_timeouts += 1
+            raise
+        finally:
+            waited = perf_counter() - started_at
+            self.checkouts += 1
+            self.checkout_wait_total += waited
+            self.checkout_wait_max = max(self.checkout_wait_max, waited)
+
+    def stats(self) -> PoolStats:
+        return PoolStats(
+            size=self.size(),
+            checked_in=self.checkedin(),
+            checked_out=self.checkedout(),
+            overflow=self.overflow(),
+            checkouts=self.checkouts,
+            checkout_timeouts=self.checkout_timeouts,
+            checkout_wait_avg=self.checkout_wait_total / self.checkouts if self.checkouts else 0.0,
+            checkout_wait_max=self.checkout_wait_max,
+        )
+
+
+async def prewarm_pool(engine: AsyncEngine, count: int) -> None:
+    # Connections are opened concurrently and held together, so that the pool keeps all of them afterwards.
+    connections = [engine.connect() for _ in range(count)]
+    results = await gather(*(connection.start() for connection in connections), return_exceptions=True)
+    await gather(*(connection.close() for connection, result in zip(connections, results, strict=True) if not isinstance(result, BaseException)))
+
+    if failures := [result for result in results if isinstance(result, BaseException)]:
+        logger.warning("Failed to prewarm %d of %d connections", len(failures), count, exc_info=failures[0])
+
+
+async def watch_pool_liveness(engine: AsyncEngine, interval: float) -> None:
+    # Replaces pool_pre_ping on every checkout.
+    # When the ping hits a dropped connection, SQLAlchemy invalidates every connection in the pool opened before it.
+    while True:
+        await sleep(interval)
+        try:
+            async with engine.connect() as connection:
+                await connection.exec_driver_sql("SELECT 1")
+        except Exception as err:
+            logger.warning("Database liveness check failed", exc_info=err)
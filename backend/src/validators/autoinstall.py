@@ -0,0 +1,25 @@
+from typing import Any, NoReturn
+
+from pydantic import TypeAdapter, ValidationError
+from src.consts.errors import ClientError, ErrorStruct
+from src.schemas.autoinstall import Autoinstall
+
+# Built once per process and shared by the API write path, the renderer and the JSON schema route.
+autoinstall_adapter: TypeAdapter[Autoinstall] = TypeAdapter(Autoinstall)
+
+
+def validate_autoinstall(config: dict[str, Any]) -> Autoinstall:
+    return autoinstall_adapter.validate_python(config)
+
+
+def get_autoinstall_json_schema() -> dict[str, Any]:
+    return autoinstall_adapter.json_schema(by_alias=True)
+
+
+def raise_autoinstall_errors(err: ValidationError, loc: list[str]) -> NoReturn:
+    ErrorStruct.raise_multiple(
+        [
+            ClientError.REQUEST_BODY_INVALID(type=error["type"], msg=error["msg"], loc=[*loc, *map(str, error["loc"])])
+            for error in err.errors(include_url=False)
+        ]
+    )
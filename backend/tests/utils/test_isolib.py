@@ -0,0 +1,134 @@
+from pathlib import Path
+from struct import pack
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+from src.utils.isolib import SECTOR_SIZE, VOLUME_ID_OFFSET, VOLUME_ID_SIZE, IsoImage, IsoOverlay, both_endian32, read_overlay
+
+# Sectors of the generated image: the primary, Joliet and terminator volume descriptors, the two root directories, then the file data.
+PRIMARY_SECTOR = 16
+PRIMARY_ROOT_SECTOR, JOLIET_ROOT_SECTOR = 19, 20
+FIRST_FILE_SECTOR = 21
+
+
+def both_endian16(value: int) -> bytes:
+    return pack("<H", value) + pack(">H", value)
+
+
+def directory_record(identifier: bytes, extent: int, size: int, is_directory: bool = False) -> bytes:
+    record = (
+        bytes(2)  # Length, then extended attribute length, with the length set below
+        + both_endian32(extent)
+        + both_endian32(size)
+        + bytes(7)  # Recording date
+        + bytes([0x02 if is_directory else 0, 0, 0])
+        + both_endian16(1)  # Volume sequence number
+        + bytes([len(identifier)])
+        + identifier
+    )
+    record += bytes(len(record) % 2)
+    return bytes([len(record)]) + record[1:]
+
+
+def directory(sector: int, entries: list[bytes]) -> bytes:
+    records = [directory_record(b"\0", sector, SECTOR_SIZE, True), directory_record(b"\1", sector, SECTOR_SIZE, True), *entries]
+    return b"".join(records).ljust(SECTOR_SIZE, b"\0")
+
+
+def volume_descriptor(type: int, volume_id: bytes, root_sector: int, size: int, escape_sequence: bytes = b"") -> bytes:
+    descriptor = bytearray(SECTOR_SIZE)
+    descriptor[0:7] = bytes([type]) + b"CD001\1"
+    descriptor[VOLUME_ID_OFFSET : VOLUME_ID_OFFSET + VOLUME_ID_SIZE] = volume_id
+    descriptor[80:88] = both_endian32(size // SECTOR_SIZE)
+    descriptor[88 : 88 + len(escape_sequence)] = escape_sequence
+    descriptor[156:190] = directory_record(b"\0", root_sector, SECTOR_SIZE, True)
+    return bytes(descriptor)
+
+
+def build_iso(files: dict[str, bytes]) -> bytes:
+    """A minimal ISO9660 image with a Joliet tree, both pointing at the same extents of the files in the root directory."""
+    primary_records, joliet_records, data, sector = [], [], b"", FIRST_FILE_SECTOR
+    for name, content in files.items():
+        primary_records.append(directory_record(f"{name.upper()};1".encode(), sector, len(content)))
+        joliet_records.append(directory_record(f"{name};1".encode("utf-16-be"), sector, len(content)))
+        padded = content.ljust(-(-len(content) // SECTOR_SIZE) * SECTOR_SIZE, b"\0")
+        data += padded
+        sector += len(padded) // SECTOR_SIZE
+
+    size = sector * SECTOR_SIZE
+    return (
+        bytes(PRIMARY_SECTOR * SECTOR_SIZE)
+        + volume_descriptor(1, b"BASE".ljust(VOLUME_ID_SIZE), PRIMARY_ROOT_SECTOR, size)
+        + volume_descriptor(2, "BASE".ljust(VOLUME_ID_SIZE // 2).encode("utf-16-be"), JOLIET_ROOT_SECTOR, size, b"%/E")
+        + bytes([255])
+        + b"CD001\1".ljust(SECTOR_SIZE - 1, b"\0")
+        + directory(PRIMARY_ROOT_SECTOR, primary_records)
+        + directory(JOLIET_ROOT_SECTOR, joliet_records)
+        + data
+    )
+
+
+class IsoOverlayTest(TestCase):
+    def setUp(self) -> None:
+        self.directory = TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.base_path = Path(self.directory.name) / "base.iso"
+        self.base_path.write_bytes(build_iso({"grub.cfg": b"linux /casper/vmlinuz ---\n", "md5sum.txt": b"0" * 3000}))
+        self.image = IsoImage(self.base_path)
+        self.addCleanup(self.image.close)
+
+    def write_overlay(self, overlay: IsoOverlay) -> IsoImage:
+        path = Path(self.directory.name) / "patched.iso"
+        path.write_bytes(b"".join(read_overlay(self.image, overlay.get_patches(), overlay.size)))
+        patched = IsoImage(path)
+        self.addCleanup(patched.close)
+        return patched
+
+    def assert_file(self, image: IsoImage, path: str, content: bytes) -> None:
+        for descriptor in image.volume_descriptors:
+            self.assertEqual(image.read(image.find(path, descriptor)), content)
+
+    def test_replace_file_in_place(self) -> None:
+        overlay = IsoOverlay(self.image)
+        overlay.replace_file("grub.cfg", b"linux /casper/vmlinuz autoinstall ---\n")
+
+        patched = self.write_overlay(overlay)
+        self.assertEqual(patched.size, self.image.size)
+        self.assertEqual(patched.find("grub.cfg").extent, self.image.find("grub.cfg").extent)
+        self.assert_file(patched, "grub.cfg", b"linux /casper/vmlinuz autoinstall ---\n")
+        self.assert_file(patched, "md5sum.txt", b"0" * 3000)
+
+    def test_replace_file_appended(self) -> None:
+        content = b"1" * (SECTOR_SIZE * 2 + 1)
+        overlay = IsoOverlay(self.image)
+        overlay.replace_file("grub.cfg", content)
+
+        patched = self.write_overlay(overlay)
+        self.assertEqual(patched.size, self.image.size + SECTOR_SIZE * 3)
+        self.assertEqual(patched.find("grub.cfg").start, self.image.size)
+        for descriptor in patched.volume_descriptors:
+            self.assertEqual(patched.data[descriptor.offset + 80 : descriptor.offset + 88], both_endian32(patched.size // SECTOR_SIZE))
+        self.assert_file(patched, "grub.cfg", content)
+        self.assert_file(patched, "md5sum.txt", b"0" * 3000)
+
+    def test_set_volume_id(self) -> None:
+        overlay = IsoOverlay(self.image)
+        overlay.set_volume_id("Ubuntu autoinstall")
+
+        patched = self.write_overlay(overlay)
+        primary, joliet = patched.volume_descriptors
+        # Joliet identifiers are UCS-2, so only the first 16 characters fit.
+        for descriptor, volume_id in ((primary, b"Ubuntu autoinstall".ljust(32)), (joliet, "Ubuntu autoinsta".encode("utf-16-be"))):
+            start = descriptor.offset + VOLUME_ID_OFFSET
+            self.assertEqual(patched.data[start : start + VOLUME_ID_SIZE], volume_id)
+
+    def test_read_overlay_range(self) -> None:
+        overlay = IsoOverlay(self.image)
+        overlay.replace_file("grub.cfg", b"patched")
+        overlay.replace_file("md5sum.txt", b"2" * SECTOR_SIZE * 3)
+        patches = overlay.get_patches()
+        full = b"".join(read_overlay(self.image, patches, overlay.size))
+
+        self.assertEqual(len(full), overlay.size)
+        for start, end in ((0, 1), (PRIMARY_SECTOR * SECTOR_SIZE + 70, JOLIET_ROOT_SECTOR * SECTOR_SIZE + 5), (self.image.size - 3, overlay.size)):
+            self.assertEqual(b"".join(read_overlay(self.image, patches, overlay.size, start, end)), full[start:end])